@@ -0,0 +1,310 @@
+# Define the pluggable computer player strategies. A strategy sees an Observation of the table from its own seat and picks
+# where to draw from and which card to discard. Both Game and SimulationGame drive computer seats through this interface.
+
+from __future__ import annotations
+
+import random
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Sequence as SequenceABC
+from typing import List, Sequence, Tuple
+
+from rules import STANDARD, Rules
+
+STEAL_PROBABILITY = 0.4  # Chance the original computer player steals from a discard pile
+
+
+class Observation:
+    # Everything a computer seat can see on its turn. Cards are card ids under the rules (see rules.py).
+    __slots__ = ("seat", "counts", "discard_piles", "hand_sizes", "deck_remaining", "open_piles", "rules")
+
+    def __init__(self, seat: int, counts: Sequence[int], discard_piles: Sequence[List[int]],
+                 hand_sizes: Sequence[int], deck_remaining: int, open_piles: Sequence[int] | None = None,
+                 rules: Rules | None = None) -> None:
+        self.seat = seat
+        self.counts = counts                  # Count array of this seat's hand, one slot per card id
+        self.discard_piles = discard_piles    # Every seat's discard pile, bottom to top (public information)
+        self.hand_sizes = hand_sizes          # Number of cards in every seat's hand
+        self.deck_remaining = deck_remaining
+        self.open_piles = open_piles          # Seats with a non-empty discard pile in seat order, when the table keeps it
+        self.rules = rules if rules is not None else STANDARD
+
+
+    def steal_options(self) -> List[int]:
+        # Seats whose discard pile can be drawn from
+        if self.open_piles is not None:
+            return [seat for seat in self.open_piles if seat != self.seat]
+        return [seat for seat, pile in enumerate(self.discard_piles) if seat != self.seat and pile]
+
+
+    def unseen(self) -> List[int]:
+        # How many copies of each card id are hidden in the deck or in the other hands
+        copies = self.rules.copies_per_card
+        unseen = [copies - count for count in self.counts]
+        for pile in self.discard_piles:
+            for cid in pile:
+                unseen[cid] -= 1
+        return unseen
+
+
+class HandSizes(SequenceABC):
+    # Observation.hand_sizes without building a list per decision: every seat holds the dealt hand size between
+    # turns, only the seat to move differs
+    __slots__ = ("seats", "size", "seat", "seat_size")
+
+    def __init__(self, seats: int, size: int, seat: int, seat_size: int) -> None:
+        self.seats = seats
+        self.size = size
+        self.seat = seat
+        self.seat_size = seat_size
+
+    def __len__(self) -> int:
+        return self.seats
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.seats))]
+        if index < 0:
+            index += self.seats
+        if not 0 <= index < self.seats:
+            raise IndexError(index)
+        return self.seat_size if index == self.seat else self.size
+
+
+class ComputerStrategy(ABC):
+    # Interface for computer players. Return None from choose_draw to draw from the deck. A subclass that does not
+    # define both choose_draw and choose_discard cannot be instantiated.
+    # The batch methods answer many seats' decisions at once (see batch_engine.ObservationBatch), with -1 for the deck.
+    # By default they ask the single decision methods row by row, vectorized strategies override them.
+
+    def supports(self, rules: Rules) -> bool:
+        # Whether this strategy can play by the given rules. Game and SimulationGame check it before the first deal.
+        return True
+
+    @abstractmethod
+    def choose_draw(self, obs: Observation, rng) -> int | None:
+        ...
+
+    @abstractmethod
+    def choose_discard(self, obs: Observation, rng) -> int:
+        ...
+
+    def choose_draw_batch(self, batch, rng) -> Sequence[int]:
+        choices = (self.choose_draw(obs, rng) for obs in batch.observations)
+        return [-1 if seat is None else seat for seat in choices]
+
+    def choose_discard_batch(self, batch, rng) -> Sequence[int]:
+        return [self.choose_discard(obs, rng) for obs in batch.observations]
+
+
+class RandomStrategy(ComputerStrategy):
+    # The original computer player: 40% chance to steal from a random opponent, then discard a random card
+
+    def __init__(self, steal_probability: float = STEAL_PROBABILITY) -> None:
+        self.steal_probability = steal_probability
+
+
+    def choose_draw(self, obs: Observation, rng) -> int | None:
+        candidates = obs.steal_options()
+        if candidates and rng.random() < self.steal_probability:
+            return rng.choice(candidates)
+        return None
+
+
+    def choose_discard(self, obs: Observation, rng) -> int:
+        # Every card in the hand is equally likely, so pick the k-th card in card id order
+        k = rng.randrange(obs.hand_sizes[obs.seat])
+        for cid, count in enumerate(obs.counts):
+            if k < count:
+                return cid
+            k -= count
+        raise ValueError("cannot discard from an empty hand")
+
+
+# Rollout helpers. Rollouts keep each seat as a count array plus one solver key per category (see
+# solver.CategoryTable), 24 slots and solver.category_key() in the standard game.
+
+def _keep_value(counts: List[int], cid: int, ingredients: int = 3) -> int:
+    # How much a card helps its hand: copies count double (three of a kind), other ingredients of the category once
+    base = cid - cid % ingredients
+    partners = ingredients - counts[base:base + ingredients].count(0)
+    return 2 * counts[cid] + partners
+
+
+def greedy_discard(counts: List[int], ingredients: int = 3) -> int:
+    # Discard the card that helps the hand least
+    best_cid = -1
+    best_value = 1 << 30
+    for cid, count in enumerate(counts):
+        if count:
+            value = _keep_value(counts, cid, ingredients)
+            if value < best_value:
+                best_cid, best_value = cid, value
+    return best_cid
+
+
+def hand_keys(counts: Sequence[int], rules: Rules = STANDARD) -> List[int]:
+    key = rules.table.key
+    step = rules.ingredients
+    return [key(counts[base:base + step]) for base in range(0, len(counts), step)]
+
+
+def hand_sets(keys: Sequence[int], rules: Rules = STANDARD) -> int:
+    sets = rules.table.sets
+    return sum(sets[key] for key in keys)
+
+
+def best_option(options: list, totals: Sequence[float], visits: Sequence[int]):
+    # Option with the highest mean rollout value
+    best = max(range(len(options)), key=lambda i: totals[i] / visits[i] if visits[i] else float("-inf"))
+    return options[best]
+
+
+class MonteCarloStrategy(ComputerStrategy):
+    # Determinized Monte Carlo search. Each rollout deals the unseen cards at random into the deck and the other hands,
+    # applies one candidate move and plays every seat greedily for a few rounds. Candidates take turns getting rollouts
+    # until the per-move deadline, so the number of rollouts grows with the time budget.
+
+    def __init__(self, time_budget: float = 0.02, horizon_rounds: int = 4, seed: int | None = None) -> None:
+        self.time_budget = time_budget          # Seconds per decision (hard deadline)
+        self.horizon_rounds = horizon_rounds    # Rounds of play per rollout before the hand is scored
+        self.rng = random.Random(seed)
+        self.last_rollouts = 0                  # Rollouts run for the most recent decision
+
+
+    # Decisions
+
+    def choose_draw(self, obs: Observation, rng) -> int | None:
+        options: List[int | None] = [None] + obs.steal_options()
+        if len(options) == 1:
+            return None
+
+        # A steal that wins on the spot needs no search
+        rules = obs.rules
+        set_table = rules.table.sets
+        keys = hand_keys(obs.counts, rules)
+        sets = hand_sets(keys, rules)
+        for seat in options[1:]:
+            cid = obs.discard_piles[seat][-1]
+            key = keys[cid // rules.ingredients]
+            if sets - set_table[key] + set_table[key + rules.key_steps[cid]] >= rules.winning_sets:
+                return seat
+
+        return self._search(obs, options, drawing=True)
+
+
+    def choose_discard(self, obs: Observation, rng) -> int:
+        options = [cid for cid, count in enumerate(obs.counts) if count]
+        if len(options) == 1:
+            return options[0]
+        return self._search(obs, options, drawing=False)
+
+
+    def _search(self, obs: Observation, options: list, drawing: bool):
+        totals, visits = self.evaluate(obs, options, drawing, time.perf_counter() + self.time_budget)
+        self.last_rollouts = sum(visits)
+        return best_option(options, totals, visits)
+
+
+    def evaluate(self, obs: Observation, options: list, drawing: bool, deadline: float) -> Tuple[List[float], List[int]]:
+        # Rollout value totals and visit counts per option, gathered until the deadline (at least one rollout each).
+        # After the first visit to every option the clock is read after every rollout, so a move overruns its
+        # deadline by one rollout at most.
+        totals = [0.0] * len(options)
+        visits = [0] * len(options)
+
+        for i, option in enumerate(options):
+            totals[i] += self._rollout(obs, option, drawing)
+            visits[i] += 1
+
+        i = 0
+        while time.perf_counter() < deadline:
+            totals[i] += self._rollout(obs, options[i], drawing)
+            visits[i] += 1
+            i += 1
+            if i == len(options):
+                i = 0
+
+        return totals, visits
+
+
+    # Rollouts
+
+    def _rollout(self, obs: Observation, option, drawing: bool) -> float:
+        rng = self.rng
+        me = obs.seat
+        n = len(obs.hand_sizes)
+        rules = obs.rules
+        set_table = rules.table.sets
+        key_step = rules.key_steps
+        ingredients = rules.ingredients
+        winning_sets = rules.winning_sets
+
+        # Determinize: deal the unseen cards at random into the other hands and the deck
+        hidden = [cid for cid, count in enumerate(obs.unseen()) for _ in range(count)]
+        rng.shuffle(hidden)
+        counts = []
+        for seat in range(n):
+            if seat == me:
+                counts.append(list(obs.counts))
+            else:
+                hand = [0] * rules.num_card_types
+                for _ in range(obs.hand_sizes[seat]):
+                    hand[hidden.pop()] += 1
+                counts.append(hand)
+        deck = hidden
+        piles = [list(pile) for pile in obs.discard_piles]
+        keys = [hand_keys(c, rules) for c in counts]
+        sets = [hand_sets(k, rules) for k in keys]
+
+        def change(seat: int, cid: int, delta: int) -> None:
+            cat = cid // ingredients
+            old = keys[seat][cat]
+            new = old + delta * key_step[cid]
+            keys[seat][cat] = new
+            counts[seat][cid] += delta
+            sets[seat] += set_table[new] - set_table[old]
+
+        # The candidate move itself
+        if drawing:
+            if option is None:
+                if not deck:
+                    return 0.0
+                change(me, deck.pop(), 1)
+            else:
+                change(me, piles[option].pop(), 1)
+            if sets[me] >= winning_sets:
+                return 1.0
+            cid = greedy_discard(counts[me], ingredients)
+        else:
+            cid = option
+        change(me, cid, -1)
+        piles[me].append(cid)
+
+        # Greedy play for every seat: steal a top card that makes a new set, otherwise draw from the deck
+        seat = (me + 1) % n
+        for _ in range(self.horizon_rounds * n):
+            if not deck:
+                break
+            card = -1
+            for other in range(n):
+                if other != seat and piles[other]:
+                    top = piles[other][-1]
+                    key = keys[seat][top // ingredients]
+                    if set_table[key + key_step[top]] > set_table[key]:
+                        card = piles[other].pop()
+                        break
+            if card < 0:
+                card = deck.pop()
+            change(seat, card, 1)
+            if sets[seat] >= winning_sets:
+                return 1.0 if seat == me else 0.0
+            cid = greedy_discard(counts[seat], ingredients)
+            change(seat, cid, -1)
+            piles[seat].append(cid)
+            seat = (seat + 1) % n
+
+        # No winner within the horizon: score the hand by its sets and near sets
+        mine = counts[me]
+        near = sum(1 for count in mine if count == 2)
+        return 0.25 * sets[me] + 0.05 * near
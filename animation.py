@@ -0,0 +1,177 @@
+# Define the animation scheduler. Game text is queued and written by a background thread, so the game can work on the
+# next turn while a line is still being typed out. One global speed setting scales every delay (0 = instant), and a
+# keypress (Enter on Mac / Linux) skips whatever is still queued until the next prompt. On Mac / Linux a line typed ahead
+# during the animation is kept and answers that prompt.
+
+import queue
+import sys
+import threading
+import time
+from typing import Callable
+
+from profiler import profiler
+
+# Windows can poll single keypresses, other systems poll stdin for a finished line
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+try:
+    import select
+except ImportError:
+    select = None
+
+FRAME_SECONDS = 1 / 30  # Typed text is written once per frame instead of once per character
+
+
+def _key_pressed() -> str | None:
+    # None when no key is waiting, otherwise the line it finished ("" for a single key on Windows)
+    if msvcrt is not None:
+        if msvcrt.kbhit():
+            msvcrt.getwch()
+            return ""
+        return None
+    if select is not None and sys.stdin.isatty():
+        ready, _, _ = select.select([sys.stdin], [], [], 0)
+        if ready:
+            return sys.stdin.readline().rstrip("\n")
+    return None
+
+
+class Animator:
+    def __init__(self, speed: float = 1.0) -> None:
+        self.speed = speed
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._skip = threading.Event()
+        self._typed_ahead: str | None = None
+
+
+    def set_speed(self, speed: float) -> None:
+        # 1 is normal speed, 2 twice as fast, 0 writes everything instantly
+        if speed < 0:
+            raise ValueError("speed must be 0 or more.")
+        self.speed = speed
+
+
+    # Queueing (all of these return immediately)
+
+    def type_line(self, text: str, delay: float = 0.03) -> None:
+        self._put("type", text, delay)
+
+
+    def line(self, text: str = "") -> None:
+        self._put("type", text, 0.0)
+
+
+    def write(self, text: str) -> None:
+        # Raw text with no newline added, used for cursor movement sequences
+        self._put("raw", text, 0.0)
+
+
+    def pause(self, seconds: float) -> None:
+        self._put("pause", None, seconds)
+
+
+    def call(self, func: Callable[[], None]) -> None:
+        # Run func in order with the queued text, used for sound effects
+        self._put("call", func, 0.0)
+
+
+    def flush(self) -> None:
+        # Block until everything queued has been written. Call before reading input.
+        if self._thread is not None:
+            self._queue.join()
+        self._skip.clear()
+
+
+    def skip(self) -> None:
+        self._skip.set()
+
+
+    def typed_ahead(self) -> str | None:
+        # The line the player typed to skip the animation, if it was more than a bare Enter. Call after flush(), the
+        # line is handed out once.
+        line, self._typed_ahead = self._typed_ahead, None
+        return line
+
+
+    # Background thread
+
+    def _put(self, kind: str, payload, seconds: float) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="animator", daemon=True)
+            self._thread.start()
+        self._queue.put((kind, payload, seconds))
+
+
+    def _run(self) -> None:
+        while True:
+            kind, payload, seconds = self._queue.get()
+            try:
+                if kind == "type":
+                    # Typing and pauses run here on the animator thread, the game thread only queues them
+                    with profiler.phase("animate"):
+                        self._type(payload, seconds)
+                elif kind == "raw":
+                    sys.stdout.write(payload)
+                    sys.stdout.flush()
+                elif kind == "pause":
+                    with profiler.phase("animate"):
+                        self._pause(seconds)
+                elif not self._skipping():
+                    payload()
+            finally:
+                self._queue.task_done()
+
+
+    def _skipping(self) -> bool:
+        if self._skip.is_set():
+            return True
+        if self.speed:
+            line = _key_pressed()
+            if line is not None:
+                if line.strip():
+                    self._typed_ahead = line
+                self._skip.set()
+                return True
+        return False
+
+
+    def _scaled(self, seconds: float) -> float:
+        return seconds / self.speed if self.speed else 0.0
+
+
+    def _type(self, text: str, delay: float) -> None:
+        out = sys.stdout
+        duration = self._scaled(len(text) * delay)
+
+        # Instant lines go out in a single write
+        if duration <= 0 or self._skipping():
+            out.write(text + "\n")
+            out.flush()
+            return
+
+        start = time.perf_counter()
+        written = 0
+        while written < len(text) and not self._skipping():
+            due = min(len(text), int((time.perf_counter() - start) / duration * len(text)) + 1)
+            if due > written:
+                out.write(text[written:due])
+                out.flush()
+                written = due
+            time.sleep(FRAME_SECONDS)
+
+        out.write(text[written:] + "\n")
+        out.flush()
+
+
+    def _pause(self, seconds: float) -> None:
+        end = time.perf_counter() + self._scaled(seconds)
+        while time.perf_counter() < end and not self._skipping():
+            time.sleep(min(FRAME_SECONDS, max(end - time.perf_counter(), 0)))
+
+
+# Shared by the whole game
+animator = Animator()
@@ -0,0 +1,104 @@
+# Batched decision engine. Steps many SimulationGames at once as decision generators (SimulationGame.decisions) and
+# hands every pending decision of one kind to the strategy as a single ObservationBatch, so a vectorized strategy
+# scores thousands of seats with a few NumPy calls instead of one Python call per seat per turn. Finished games are
+# replaced by new ones until the requested number of games has been played.
+
+from __future__ import annotations
+
+import random
+from typing import List, Sequence
+
+# NumPy is only needed for the batched engine, the game itself has no external dependencies
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ai import ComputerStrategy, Observation
+from card import NUM_CARD_TYPES
+from simulation import DRAW, SimulationGame, SimulationResult
+from tournament import game_seed
+
+DEFAULT_CONCURRENCY = 1024     # Games in flight at once
+
+
+class ObservationBatch:
+    # Pending decisions from many games, one row per decision, as compact arrays:
+    #   seats           (rows,)             seat to move
+    #   counts          (rows, 24)          that seat's hand as card id counts
+    #   tops            (rows, players)     top card id of every discard pile it can take from, -1 where it cannot
+    #                                       (its own pile or an empty one)
+    #   deck_remaining  (rows,)
+    # observations keeps the Observation of every row for strategies that decide one row at a time.
+    __slots__ = ("observations", "seats", "counts", "tops", "deck_remaining")
+
+    def __init__(self, observations: Sequence[Observation], num_players: int) -> None:
+        if np is None:
+            raise RuntimeError("ObservationBatch requires NumPy. Install it with 'pip install numpy'.")
+        rows = len(observations)
+        self.observations = observations
+        self.seats = np.fromiter((obs.seat for obs in observations), dtype=np.int64, count=rows)
+        self.counts = np.array([obs.counts for obs in observations], dtype=np.int16).reshape(rows, NUM_CARD_TYPES)
+        self.deck_remaining = np.fromiter((obs.deck_remaining for obs in observations), dtype=np.int64, count=rows)
+        tops = np.array([[pile[-1] if pile else -1 for pile in obs.discard_piles] for obs in observations],
+                        dtype=np.int16).reshape(rows, num_players)
+        tops[np.arange(rows), self.seats] = -1
+        self.tops = tops
+
+
+    def __len__(self) -> int:
+        return len(self.observations)
+
+
+def run_batched(num_games: int, strategies: ComputerStrategy | Sequence[ComputerStrategy], num_players: int = 4,
+                seed: int = 0, concurrency: int = DEFAULT_CONCURRENCY) -> List[SimulationResult]:
+    # Play num_games games with up to concurrency of them in flight. strategies is one strategy for every seat or one
+    # per seat. Game i deals from game_seed(seed, i) like a tournament, results come back in game order.
+    if np is None:
+        raise RuntimeError("run_batched requires NumPy. Install it with 'pip install numpy'.")
+    if isinstance(strategies, ComputerStrategy):
+        strategies = [strategies] * num_players
+    if len(strategies) != num_players:
+        raise ValueError("strategies needs one entry per seat.")
+    rng = random.Random(seed)
+    results: List[SimulationResult | None] = [None] * num_games
+    live = []           # [game index, generator, pending (kind, observation)]
+    started = 0
+
+    def start_games() -> None:
+        nonlocal started
+        while started < num_games and len(live) < concurrency:
+            steps = SimulationGame(num_players, seed=game_seed(seed, started)).decisions()
+            live.append([started, steps, next(steps)])
+            started += 1
+
+    start_games()
+    shared = all(strategy is strategies[0] for strategy in strategies)
+    while live:
+        # Group the pending decisions by kind (and by strategy when seats differ), one batch call per group
+        groups = {}
+        for entry in live:
+            kind, obs = entry[2]
+            strategy = strategies[0] if shared else strategies[obs.seat]
+            group = groups.get((kind, id(strategy)))
+            if group is None:
+                group = groups[kind, id(strategy)] = (strategy, [])
+            group[1].append(entry)
+
+        still_live = []
+        for (kind, _), (strategy, entries) in groups.items():
+            batch = ObservationBatch([entry[2][1] for entry in entries], num_players)
+            if kind == DRAW:
+                answers = [None if seat < 0 else seat for seat in map(int, strategy.choose_draw_batch(batch, rng))]
+            else:
+                answers = list(map(int, strategy.choose_discard_batch(batch, rng)))
+            for entry, answer in zip(entries, answers):
+                try:
+                    entry[2] = entry[1].send(answer)
+                    still_live.append(entry)
+                except StopIteration as stop:
+                    results[entry[0]] = stop.value
+
+        live[:] = still_live
+        start_games()
+    return results
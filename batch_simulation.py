@@ -0,0 +1,174 @@
+# Batched simulation engine. Holds many computer-only games as NumPy arrays and advances all of them one turn per step, using the same rules and AI policy as SimulationGame.
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+# NumPy is only needed for the batched engine, the game itself has no external dependencies
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ai import STEAL_PROBABILITY
+from card import COPIES_PER_CARD, NUM_CARD_TYPES
+from randomness import shuffle_batch
+from simulation import HAND_SIZE, NUM_CATEGORIES
+from solver import CATEGORY_SCORES, CATEGORY_SETS, KEY_STEP, WINNING_SETS
+
+DECK_SIZE = NUM_CARD_TYPES * COPIES_PER_CARD
+
+# The solver tables as arrays: category key -> sets / score, card id -> key step and category
+if np is not None:
+    SET_TABLE = np.array(CATEGORY_SETS, dtype=np.int64)
+    SCORE_TABLE = np.array(CATEGORY_SCORES, dtype=np.int64)
+    KEY_STEPS = np.array(KEY_STEP, dtype=np.int16)
+    CARD_CATEGORY = np.arange(NUM_CARD_TYPES) // 3
+
+
+@dataclass
+class BatchResult:
+    # One row per game, the array version of SimulationResult
+    winner: "np.ndarray"            # (games,) seat index of the winner, -1 for a draw
+    turns: "np.ndarray"             # (games,)
+    deck_remaining: "np.ndarray"    # (games,)
+    sets: "np.ndarray"              # (games, players)
+    scores: "np.ndarray"            # (games, players)
+
+    def __len__(self) -> int:
+        return len(self.winner)
+
+
+class BatchSimulation:
+    # N games in lockstep. Every game is on the same seat each step, finished games are masked out.
+
+    def __init__(self, num_games: int, num_players: int = 4, seed: int | None = None, rng=None) -> None:
+        if np is None:
+            raise RuntimeError("BatchSimulation requires NumPy. Install it with 'pip install numpy'.")
+        if num_players < 2:
+            raise ValueError("num_players must be at least 2.")
+        self.num_games = num_games
+        self.num_players = num_players
+        self.rng = rng if rng is not None else np.random.default_rng(seed)
+
+
+    def _shuffled_decks(self) -> "np.ndarray":
+        # Every game gets its own uniform permutation of the 96 card deck
+        template = np.repeat(np.arange(NUM_CARD_TYPES, dtype=np.int8), COPIES_PER_CARD)
+        return template[shuffle_batch(self.num_games, DECK_SIZE, self.rng)]
+
+
+    def run(self) -> BatchResult:
+        rng = self.rng
+        n = self.num_games
+        p = self.num_players
+        games = np.arange(n)
+
+        # All per-game lookups go through flat views with precomputed row offsets, which is several times
+        # cheaper in NumPy than two dimensional fancy indexing.
+        decks = self._shuffled_decks().reshape(-1)
+        deck_rows = games * DECK_SIZE
+        drawn = np.zeros(n, dtype=np.int64)             # Cards taken from the top of each deck so far
+
+        # Seat-major layout so the current seat's arrays are contiguous. Each hand keeps its cards in
+        # HAND_SIZE + 1 slots (the drawn card goes in the last one) next to one solver.category_key() per category.
+        hands = np.zeros((p, n * (HAND_SIZE + 1)), dtype=np.int8)
+        hand_rows = games * (HAND_SIZE + 1)
+        keys = np.zeros((p, n * NUM_CATEGORIES), dtype=np.int16)
+        key_rows = games * NUM_CATEGORIES
+
+        # Deal round robin from the top of the deck (the end of the array, like Deck.draw)
+        for slot in range(HAND_SIZE):
+            for seat in range(p):
+                card = decks[deck_rows + DECK_SIZE - 1 - drawn]
+                hands[seat, hand_rows + slot] = card
+                keys[seat, key_rows + CARD_CATEGORY[card]] += KEY_STEPS[card]
+                drawn += 1
+        sets = SET_TABLE[keys.reshape(p, n, NUM_CATEGORIES)].sum(axis=2)
+
+        # Every discard pile as a stack, a pile can never hold more than the whole deck
+        piles = np.zeros(p * n * DECK_SIZE, dtype=np.int8)
+        pile_len = np.zeros(p * n, dtype=np.int64)
+        pile_rows = games * DECK_SIZE
+
+        winner = np.full(n, -1, dtype=np.int64)
+        turns = np.zeros(n, dtype=np.int64)
+        active = np.ones(n, dtype=bool)
+        seat = 0
+
+        # Finished games stay in the arrays but every update is multiplied by their zero step mask
+        while True:
+            # Games whose deck is empty at the start of a turn end in a draw
+            active &= drawn < DECK_SIZE
+            if not active.any():
+                break
+            step = active.astype(np.int8)
+            turns += step
+
+            hand = hands[seat]
+            hand_keys = keys[seat]
+
+            # Draw: 40% chance to steal from a random opponent with a non-empty discard pile, otherwise the deck.
+            # The chosen opponent is the pick-th seat with a non-empty pile, found with one pass over the seats.
+            lengths = pile_len.reshape(p, n)
+            has_pile = [(other, lengths[other] > 0) for other in range(p) if other != seat]
+            num_candidates = np.zeros(n, dtype=np.int64)
+            for _, has in has_pile:
+                num_candidates += has
+            steal = (rng.random(n) < STEAL_PROBABILITY) & (num_candidates > 0) & active
+            pick = (rng.random(n) * num_candidates).astype(np.int64)
+            opponent = np.zeros(n, dtype=np.int64)
+            seen = np.zeros(n, dtype=np.int64)
+            for other, has in has_pile:
+                opponent[has & (seen == pick)] = other
+                seen += has
+
+            opponent_piles = opponent * n + games
+            pile_len[opponent_piles] -= steal
+            stolen = piles[opponent_piles * DECK_SIZE + pile_len[opponent_piles]]
+
+            from_deck = active & ~steal
+            top = decks[deck_rows + np.minimum(DECK_SIZE - 1 - drawn, DECK_SIZE - 1)]
+            drawn += from_deck
+
+            card = np.where(steal, stolen, top)
+            hand[hand_rows + HAND_SIZE] = card
+            at = key_rows + CARD_CATEGORY[card]
+            before = hand_keys[at]
+            after = before + step * KEY_STEPS[card]
+            hand_keys[at] = after
+            sets[seat] += SET_TABLE[after] - SET_TABLE[before]
+
+            # Immediate win check after the draw
+            won = active & (sets[seat] >= WINNING_SETS)
+            winner[won] = seat
+            active &= ~won
+            step = active.astype(np.int8)
+
+            # Discard a uniformly random slot and move the drawn card into its place
+            slot = hand_rows + (rng.random(n) * (HAND_SIZE + 1)).astype(np.int64)
+            card = hand[slot]
+            hand[slot] = hand[hand_rows + HAND_SIZE]
+            at = key_rows + CARD_CATEGORY[card]
+            before = hand_keys[at]
+            after = before - step * KEY_STEPS[card]
+            hand_keys[at] = after
+            sets[seat] += SET_TABLE[after] - SET_TABLE[before]
+            own = seat * n + games
+            piles[own * DECK_SIZE + np.minimum(pile_len[own], DECK_SIZE - 1)] = card
+            pile_len[own] += step
+
+            seat = (seat + 1) % p
+
+        keys = keys.reshape(p, n, NUM_CATEGORIES).transpose(1, 0, 2)
+        return BatchResult(
+            winner=winner,
+            turns=turns,
+            deck_remaining=DECK_SIZE - drawn,
+            sets=SET_TABLE[keys].sum(axis=2),
+            scores=SCORE_TABLE[keys].sum(axis=2),
+        )
+
+
+def simulate_batch(num_games: int, num_players: int = 4, seed: int | None = None) -> BatchResult:
+    return BatchSimulation(num_games, num_players=num_players, seed=seed).run()
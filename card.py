@@ -1,8 +1,6 @@
 # Define the card type and category / ingredient data.
 
-from dataclasses import dataclass
-
-
+COPIES_PER_CARD = 4  # Copies of every ingredient in the deck
 
 CATEGORIES = {
     "Noodles": ["RamenNoodles", "HangingNoodles", "RolledNoodles"],
@@ -50,15 +48,76 @@ CATEGORY_COLORS = {
 
 
 
-@dataclass(frozen=True)
+# Integer card ids 0-23 for the count based hand. Ids follow sort order (category, then ingredient) so id order matches Card.id_tuple() order and each category's three ingredients have consecutive ids.
+CARD_TYPES = sorted((category, ingredient) for category, ingredients in CATEGORIES.items() for ingredient in ingredients)
+NUM_CARD_TYPES = len(CARD_TYPES)
+CARD_IDS = {card_type: i for i, card_type in enumerate(CARD_TYPES)}
+
+
+def card_label(category: str, ingredient: str) -> str:
+    emoji = CATEGORY_EMOJI.get(category, "")
+    color = CATEGORY_COLORS.get(category, white)
+    return color(f"{emoji} {ingredient}")
+
+
 class Card:
-    category: str
-    ingredient: str
+    # Flyweight card: there is exactly one shared instance per card type, so Card("Seafood", "Fish") always returns the same object.
+    # The integer id, sort key, id tuple and rendered string are computed once when the type is first created.
+    __slots__ = ("category", "ingredient", "cid", "sort_key", "_id_tuple", "_label")
+    _interned: dict = {}
+
+    def __new__(cls, category: str, ingredient: str) -> "Card":
+        card = cls._interned.get((category, ingredient))
+        if card is not None:
+            return card
+        if (category, ingredient) not in CARD_IDS:
+            raise ValueError(f"Unknown card: {category} / {ingredient}")
+        return cls._intern(category, ingredient, CARD_IDS[(category, ingredient)])
+
+    @classmethod
+    def extra(cls, category: str, ingredient: str) -> "Card":
+        # A card type beyond the standard 24, for larger rule variants (see rules.py). Extra types take the ids after
+        # the standard ones in the order they are first made, rule variants number their cards themselves.
+        card = cls._interned.get((category, ingredient))
+        if card is not None:
+            return card
+        return cls._intern(category, ingredient, len(cls._interned))
+
+    @classmethod
+    def _intern(cls, category: str, ingredient: str, cid: int) -> "Card":
+        card = object.__new__(cls)
+        set_field = object.__setattr__
+        set_field(card, "category", category)
+        set_field(card, "ingredient", ingredient)
+        set_field(card, "cid", cid)
+        set_field(card, "sort_key", cid)
+        set_field(card, "_id_tuple", (category, ingredient))
+        set_field(card, "_label", card_label(category, ingredient))
+        cls._interned[(category, ingredient)] = card
+        return card
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Card is immutable")
+
+    def __reduce__(self):
+        # Unpickling (and copying) goes back through __new__ (or extra), so it returns the shared instance
+        if self.cid >= NUM_CARD_TYPES:
+            return Card.extra, (self.category, self.ingredient)
+        return Card, (self.category, self.ingredient)
+
+    def __repr__(self):
+        return f"Card(category={self.category!r}, ingredient={self.ingredient!r})"
 
     def id_tuple(self):
-        return self.category, self.ingredient
+        return self._id_tuple
 
     def __str__(self):
-        emoji = CATEGORY_EMOJI.get(self.category, "")
-        color = CATEGORY_COLORS.get(self.category, white)
-        return color(f"{emoji} {self.ingredient}")
+        return self._label
+
+
+# The canonical cards, indexed by card id
+CARDS_BY_ID = [Card(category, ingredient) for category, ingredient in CARD_TYPES]
+
+
+def card_id(card: Card) -> int:
+    return card.cid
@@ -0,0 +1,46 @@
+# Terminal client for the network server (see server.py for the line protocol). Prints what the server says and sends
+# back one line of input for every prompt.
+
+import argparse
+import socket
+
+from server import DEFAULT_HOST, DEFAULT_PORT
+
+
+def run_client(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, name: str = "Player", humans: int = 1) -> None:
+    with socket.create_connection((host, port)) as sock:
+        stream = sock.makefile("rw", encoding="utf-8", newline="\n")
+        stream.write(f"PLAY {humans} {name}\n")
+        stream.flush()
+
+        for line in stream:
+            kind, _, text = line.rstrip("\n").partition(" ")
+            if kind == "SAY":
+                print(text)
+            elif kind == "ASK":
+                # The prompt's number goes back with the answer (see server.py)
+                number, _, prompt = text.partition(" ")
+                try:
+                    answer = input(prompt)
+                except EOFError:
+                    answer = "q"
+                answer = answer.replace("\n", " ")
+                stream.write(f"{number} {answer}\n")
+                stream.flush()
+            elif kind == "BYE":
+                print(text)
+                break
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Play Hotpot on a game server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--name", default="Player", help="Name shown to the other players")
+    parser.add_argument("--humans", type=int, default=1, help="Human seats at the table (1 to 4)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_client(args.host, args.port, args.name, args.humans)
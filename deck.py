@@ -2,33 +2,51 @@
 
 import random
 from typing import List
-from card import Card, CATEGORIES
+from card import Card
+from randomness import fisher_yates, make_rng
+from rules import STANDARD, Rules
+
+# Every deck is filled from the same 96 shared Card instances, no cards are created per game
+CARD_POOL = STANDARD.card_pool
 
 class Deck:
-    # 8 categories x 3 ingredients x 4 copies = 96 card deck
+    # 8 categories x 3 ingredients x 4 copies = 96 card deck, or whatever the rules make it
 
-    def __init__(self) -> None:
+    def __init__(self, rng=None, seed: int | None = None, rules: Rules = STANDARD) -> None:
+        # rng is a random.Random, a numpy Generator or any object with random.Random's methods.
+        # Defaults to random.Random(seed) when a seed is given, otherwise the global random module.
+        self.rng = make_rng(rng, seed)
+        self.pool = rules.card_pool
         self.cards: List[Card] = []
         self._build_deck()
         self.fisher_yates_shuffle()
 
     
     def _build_deck(self) -> None:
-        self.cards.clear()
-
-        for category, ingredients in CATEGORIES.items():
-            for ingredient in ingredients:
-                for _ in range(4):
-                    self.cards.append(Card(category, ingredient))
+        # Refill the existing list in place from the shared pool
+        self.cards[:] = self.pool
+
+
+    def reset(self, seed: int | None = None, order=None) -> None:
+        # Put all the cards back and reshuffle, reusing this deck's list. A seed restarts the deck's own random stream.
+        # order is a ready made permutation of the pool positions (a row of randomness.shuffle_batch) to use instead.
+        if order is not None:
+            pool = self.pool
+            self.cards[:] = [pool[i] for i in order]
+            return
+        if seed is not None:
+            if self.rng is random:
+                self.rng = random.Random(seed)
+            else:
+                self.rng.seed(seed)
+        self._build_deck()
+        self.fisher_yates_shuffle()
 
 
     def fisher_yates_shuffle(self) -> None:
-        # Algorithm runs in O(n) time and produces a uniform random permutation
-
-        n = len(self.cards)
-        for i in range( n - 1, 0, -1):
-            j = random.randint(0, i)
-            self.cards[i], self.cards[j] = self.cards[j], self.cards[i]
+        # Algorithm runs in O(n) time and produces a uniform random permutation.
+        # The swap positions (95 for the standard deck) all come from one block of random bits (see randomness.fisher_yates).
+        fisher_yates(self.cards, self.rng)
 
     
 
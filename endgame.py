@@ -0,0 +1,296 @@
+# Exact endgame search. Once the deck is down to a few cards a seat only has a handful of draws left, few enough to
+# search every draw and discard. The solver computes the best chance of completing a winning hand with the draws left:
+# an expectimax over this seat's own decisions (max nodes) and the deck cards it draws (chance nodes).
+#
+# Model: every future draw is a uniformly random unseen card (the deck is a random part of the unseen cards, the
+# other seats' draws in between are hidden), every other seat draws from the deck, and future steals are not
+# counted because the discard tops they depend on are not known yet. The opponents winning first is not modelled.
+#
+# Positions are keyed by a Zobrist hash of hand counts, unseen (deck) counts, draws left and, at the root, the discard
+# tops on offer. Values are kept in a bounded transposition table with least recently used eviction that lives as long
+# as the solver, so positions met again on later turns are free. Search deepens one draw at a time until the per-move
+# time budget runs out.
+
+from __future__ import annotations
+
+import random
+import time
+from typing import Sequence, Tuple
+
+from ai import ComputerStrategy, Observation, hand_keys, hand_sets
+from card import COPIES_PER_CARD, NUM_CARD_TYPES
+from rules import Rules
+from solver import CATEGORY_SETS, KEY_STEP, WINNING_SETS
+
+DEFAULT_THRESHOLD = 12          # Deck cards left when the endgame search takes over
+DEFAULT_TIME_BUDGET = 0.05      # Seconds per move
+DEFAULT_TABLE_SIZE = 1 << 18    # Positions kept in the transposition table
+_MAX_DRAWS = 128
+
+# Zobrist keys: one random 64 bit word per (card id, count) for the hand and for the unseen cards, per number of draws
+# left, per card id on offer at the root and per number of draws left after a steal at the root
+_zobrist = random.Random(0x484F54504F54)
+_HAND_Z = [[_zobrist.getrandbits(64) for _ in range(COPIES_PER_CARD + 1)] for _ in range(NUM_CARD_TYPES)]
+_POOL_Z = [[_zobrist.getrandbits(64) for _ in range(COPIES_PER_CARD + 1)] for _ in range(NUM_CARD_TYPES)]
+_DRAWS_Z = [_zobrist.getrandbits(64) for _ in range(_MAX_DRAWS + 1)]
+_TOP_Z = [_zobrist.getrandbits(64) for _ in range(NUM_CARD_TYPES)]
+_DISCARD_Z = _zobrist.getrandbits(64)      # Marks positions where a discard is due rather than a draw
+_ROOT_Z = _zobrist.getrandbits(64)         # Marks a turn's first decision, where discard tops can be taken
+_STEAL_DRAWS_Z = [_zobrist.getrandbits(64) for _ in range(_MAX_DRAWS + 1)]
+
+
+class _Timeout(Exception):
+    pass
+
+
+class TranspositionTable:
+    # Position hash -> cached result in bounded memory. Entries live in two generations: lookups promote entries to the
+    # recent one, and once it holds half the capacity the old generation (everything not used since) is dropped whole.
+    # That evicts roughly least recently used first without the periodic rebuilds of deleting from a dict one entry
+    # at a time, which would show up as latency spikes.
+
+    def __init__(self, capacity: int = DEFAULT_TABLE_SIZE) -> None:
+        self.capacity = capacity
+        self.recent: dict = {}
+        self.old: dict = {}
+        self.hits = 0
+        self.misses = 0
+
+
+    def __len__(self) -> int:
+        return len(self.recent) + len(self.old)
+
+
+    def get(self, key: int):
+        value = self.recent.get(key)
+        if value is None:
+            value = self.old.pop(key, None)
+            if value is None:
+                self.misses += 1
+                return None
+            self._store(key, value)
+        self.hits += 1
+        return value
+
+
+    def put(self, key: int, value) -> None:
+        self._store(key, value)
+
+
+    def _store(self, key: int, value) -> None:
+        recent = self.recent
+        recent[key] = value
+        if len(recent) >= self.capacity // 2:
+            self.old = recent
+            self.recent = {}
+
+
+def draws_left(deck_remaining: int, num_players: int, drawing: bool) -> int:
+    # Deck draws this seat still gets if every seat draws from the deck. When drawing it is this seat's turn to draw,
+    # otherwise it has drawn and the next draw comes after the other seats' turns.
+    if drawing:
+        return (deck_remaining + num_players - 1) // num_players
+    return deck_remaining // num_players
+
+
+class EndgameSolver:
+
+    def __init__(self, table_size: int = DEFAULT_TABLE_SIZE, time_budget: float = DEFAULT_TIME_BUDGET) -> None:
+        self.table = TranspositionTable(table_size)
+        self.time_budget = time_budget
+        self.nodes = 0              # Nodes searched for the most recent move
+        self.depth = 0              # Draws looked ahead by the deepest search completed for the most recent move
+
+
+    # Moves. Each returns (best move, its chance of winning), or None when nothing could be searched in time.
+
+    def best_draw(self, counts: Sequence[int], unseen: Sequence[int], tops: Sequence[Tuple[int, int]],
+                  deck_remaining: int, num_players: int) -> Tuple[int | None, float] | None:
+        # tops: (seat, card id) for every discard pile that can be taken from
+        after_deck = draws_left(deck_remaining - 1, num_players, drawing=False)
+        after_steal = draws_left(deck_remaining, num_players, drawing=False)
+        tops_hash = 0
+        for cid in {cid for _, cid in tops}:
+            tops_hash ^= _TOP_Z[cid]
+
+        def search(horizon: int) -> Tuple[int | None, float]:
+            # The root is cached too, as the card taken (-1 for the deck) so the answer holds whichever seat has it.
+            # It is keyed by the draws actually searched on each branch (0 deck draws when the deck is empty), which
+            # also depend on the deck size, not by the horizon.
+            deck_draws = 1 + min(horizon, after_deck) if deck_remaining else 0
+            steal_draws = min(horizon, after_steal)
+            key = self.hash ^ tops_hash ^ _DRAWS_Z[deck_draws] ^ _STEAL_DRAWS_Z[steal_draws] ^ _ROOT_Z
+            cached = self.table.get(key)
+            if cached is None:
+                best, value = -1, self._draw_value(deck_draws) if deck_remaining else -1.0
+                for cid in sorted({cid for _, cid in tops}):
+                    steal = self._steal_value(cid, steal_draws)
+                    if steal > value:
+                        best, value = cid, steal
+                cached = (best, value)
+                self.table.put(key, cached)
+            best, value = cached
+            return next((seat for seat, cid in tops if cid == best), None), value
+
+        return self._deepen(counts, unseen, 0, max(after_deck, after_steal), search)
+
+
+    def best_discard(self, counts: Sequence[int], unseen: Sequence[int], draws: int) -> Tuple[int, float] | None:
+        # counts is the hand after drawing, draws the deck draws left after this discard
+        return self._deepen(counts, unseen, 1, draws, self._discard_choice)
+
+
+    def _deepen(self, counts, unseen, first: int, last: int, search):
+        # Iterative deepening over the number of future draws looked ahead, keeping the deepest search finished in time
+        self._load(counts, unseen)
+        self.nodes = 0
+        self.depth = 0
+        self._deadline = time.perf_counter() + self.time_budget
+        result = None
+        for horizon in range(first, min(last, _MAX_DRAWS - 1) + 1):
+            try:
+                result = search(horizon)
+            except _Timeout:
+                break
+            self.depth = horizon
+            if result[1] >= 1.0:
+                break
+        return result
+
+
+    # Search state: this seat's counts and category keys, the unseen counts and the running Zobrist hash of both
+
+    def _load(self, counts: Sequence[int], unseen: Sequence[int]) -> None:
+        self.counts = list(counts)
+        self.unseen = [max(0, u) for u in unseen]
+        self.pool = sum(self.unseen)
+        self.keys = hand_keys(self.counts)
+        self.sets = hand_sets(self.keys)
+        self.hash = 0
+        for cid in range(NUM_CARD_TYPES):
+            self.hash ^= _HAND_Z[cid][self.counts[cid]] ^ _POOL_Z[cid][self.unseen[cid]]
+
+
+    def _change(self, cid: int, delta: int) -> None:
+        count = self.counts[cid]
+        self.hash ^= _HAND_Z[cid][count] ^ _HAND_Z[cid][count + delta]
+        self.counts[cid] = count + delta
+        cat = cid // 3
+        old = self.keys[cat]
+        self.keys[cat] = old + delta * KEY_STEP[cid]
+        self.sets += CATEGORY_SETS[old + delta * KEY_STEP[cid]] - CATEGORY_SETS[old]
+
+
+    def _take_unseen(self, cid: int, delta: int) -> None:
+        count = self.unseen[cid]
+        self.hash ^= _POOL_Z[cid][count] ^ _POOL_Z[cid][count - delta]
+        self.unseen[cid] = count - delta
+        self.pool -= delta
+
+
+    def _tick(self) -> None:
+        self.nodes += 1
+        if time.perf_counter() > self._deadline:
+            raise _Timeout
+
+
+    def _wins_with(self, cid: int) -> bool:
+        key = self.keys[cid // 3]
+        return self.sets - CATEGORY_SETS[key] + CATEGORY_SETS[key + KEY_STEP[cid]] >= WINNING_SETS
+
+
+    # Node values
+
+    def _draw_value(self, draws: int) -> float:
+        # Chance node: chance of winning with this many deck draws left, before the next draw
+        if draws <= 0 or not self.pool:
+            return 0.0
+        key = self.hash ^ _DRAWS_Z[draws]
+        value = self.table.get(key)
+        if value is not None:
+            return value
+        self._tick()
+
+        total = 0.0
+        pool = self.pool
+        for cid in range(NUM_CARD_TYPES):
+            hidden = self.unseen[cid]
+            if not hidden:
+                continue
+            if self._wins_with(cid):
+                total += hidden
+            elif draws > 1:
+                self._change(cid, 1)
+                self._take_unseen(cid, 1)
+                total += hidden * self._discard_choice(draws - 1)[1]
+                self._take_unseen(cid, -1)
+                self._change(cid, -1)
+        value = total / pool
+        self.table.put(key, value)
+        return value
+
+
+    def _discard_choice(self, draws: int) -> Tuple[int, float]:
+        # Max node: the best discard from a hand that has just drawn, and the chance of winning after it
+        key = self.hash ^ _DRAWS_Z[draws] ^ _DISCARD_Z
+        cached = self.table.get(key)
+        if cached is not None:
+            return cached
+        self._tick()
+        best_cid, best = -1, -1.0
+        for cid in range(NUM_CARD_TYPES):
+            if self.counts[cid]:
+                self._change(cid, -1)
+                value = self._draw_value(draws)
+                self._change(cid, 1)
+                if value > best:
+                    best_cid, best = cid, value
+        self.table.put(key, (best_cid, best))
+        return best_cid, best
+
+
+    def _steal_value(self, cid: int, draws: int) -> float:
+        # Value of taking a discard top now: a win on the spot, otherwise the best discard afterwards
+        if self._wins_with(cid):
+            return 1.0
+        self._change(cid, 1)
+        value = self._discard_choice(draws)[1]
+        self._change(cid, -1)
+        return value
+
+
+class EndgameStrategy(ComputerStrategy):
+    # Plays like the fallback strategy until the deck is down to threshold cards, then plays the endgame search's
+    # moves. The fallback also decides whenever the search finds no move with any chance of winning.
+
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD, time_budget: float = DEFAULT_TIME_BUDGET,
+                 table_size: int = DEFAULT_TABLE_SIZE, fallback: ComputerStrategy | None = None) -> None:
+        if fallback is None:
+            from odds import OddsStrategy
+            fallback = OddsStrategy()
+        self.threshold = threshold
+        self.fallback = fallback
+        self.solver = EndgameSolver(table_size, time_budget)
+
+
+    def supports(self, rules: Rules) -> bool:
+        # The search's Zobrist keys and solver tables cover the standard deck only
+        return rules.standard_cards and self.fallback.supports(rules)
+
+
+    def choose_draw(self, obs: Observation, rng) -> int | None:
+        if obs.deck_remaining <= self.threshold:
+            tops = [(seat, obs.discard_piles[seat][-1]) for seat in obs.steal_options()]
+            found = self.solver.best_draw(obs.counts, obs.unseen(), tops, obs.deck_remaining, len(obs.hand_sizes))
+            if found is not None and found[1] > 0.0:
+                return found[0]
+        return self.fallback.choose_draw(obs, rng)
+
+
+    def choose_discard(self, obs: Observation, rng) -> int:
+        if obs.deck_remaining <= self.threshold:
+            draws = draws_left(obs.deck_remaining, len(obs.hand_sizes), drawing=False)
+            found = self.solver.best_discard(obs.counts, obs.unseen(), draws)
+            if found is not None and found[1] > 0.0:
+                return found[0]
+        return self.fallback.choose_discard(obs, rng)
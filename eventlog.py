@@ -0,0 +1,177 @@
+# Binary game event log. The header stores the rules (see rules.py), the human seats and the shuffled deck, then every
+# deal, draw, discard and game end is one 9 byte record, so a log can be memory-mapped and any turn found by binary
+# search. Replaying a log rebuilds the table from the records alone, the random number generator is never used.
+# Version 1 logs (standard rules, one byte card ids) can still be read.
+
+from __future__ import annotations
+
+import mmap
+import struct
+from typing import Iterator, List, NamedTuple
+
+from rules import STANDARD, Rules
+
+MAGIC = b"HPLG"
+VERSION = 2
+
+# magic, version, number of seats, human seats, deck size, then the rules: copies per card, categories, ingredients,
+# hand size and winning sets. The deck order (two bytes per card id) follows.
+HEADER = struct.Struct("<4sHBBIHHHHH")
+# turn, player seat, action, source, card id
+RECORD = struct.Struct("<IBBBH")
+
+# Version 1: no rules (always the standard ones) and one byte card ids
+_V1_HEADER = struct.Struct("<4sHBBH")
+_V1_RECORD = struct.Struct("<IBBBB")
+_V1_NONE = 255
+
+# Actions
+DEAL = 0
+DRAW = 1
+DISCARD = 2
+WIN = 3
+QUIT = 4
+ACTION_NAMES = ("deal", "draw", "discard", "win", "quit")
+
+NONE = 255          # Source for deck draws
+NO_CARD = 0xFFFF    # Card for records without a card (see rules.MAX_CARD_TYPES)
+
+WRITE_BUFFER = 1 << 16
+
+
+class Event(NamedTuple):
+    turn: int
+    player: int
+    action: int
+    source: int     # Seat whose discard pile was drawn from, NONE for the deck
+    card: int       # Card id, NO_CARD when the action has no card
+
+
+    def describe(self) -> str:
+        text = f"turn {self.turn}: seat {self.player} {ACTION_NAMES[self.action]}"
+        if self.action == DRAW:
+            text += " from deck" if self.source == NONE else f" from seat {self.source}"
+        if self.card != NO_CARD:
+            text += f" card {self.card}"
+        return text
+
+
+class EventLogWriter:
+    # Streams records through a large write buffer, a record costs one struct pack and one buffered write
+
+    def __init__(self, path: str, rules: Rules, human_count: int, deck_order: List[int]) -> None:
+        self.path = path
+        self._file = open(path, "wb", buffering=WRITE_BUFFER)
+        self._file.write(HEADER.pack(MAGIC, VERSION, rules.num_players, human_count, len(deck_order),
+                                     rules.copies_per_card, rules.categories, rules.ingredients, rules.hand_size,
+                                     rules.winning_sets))
+        self._file.write(struct.pack(f"<{len(deck_order)}H", *deck_order))
+        self._pack = RECORD.pack
+        self._write = self._file.write
+
+
+    def record(self, turn: int, player: int, action: int, source: int = NONE, card: int = NO_CARD) -> None:
+        self._write(self._pack(turn, player, action, source, card))
+
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+    def __enter__(self) -> "EventLogWriter":
+        return self
+
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class EventLog:
+    # Read-only view of a log file. Records are decoded straight from the memory map on access.
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _V1_HEADER.size:
+            raise ValueError(f"{path} is not a game event log.")
+        magic, version = struct.unpack_from("<4sH", self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a game event log.")
+        if version == VERSION:
+            (_, _, self.num_players, self.human_count, deck_size,
+             copies, categories, ingredients, hand_size, winning_sets) = HEADER.unpack_from(self._map)
+            self.rules = Rules(self.num_players, copies, categories, ingredients, hand_size, winning_sets)
+            self.deck_order = list(struct.unpack_from(f"<{deck_size}H", self._map, HEADER.size))
+            self._start = HEADER.size + 2 * deck_size
+            self._record = RECORD
+        elif version == 1:
+            _, _, self.num_players, self.human_count, deck_size = _V1_HEADER.unpack_from(self._map)
+            self.rules = STANDARD.with_players(self.num_players)
+            self.deck_order = list(self._map[_V1_HEADER.size:_V1_HEADER.size + deck_size])
+            self._start = _V1_HEADER.size + deck_size
+            self._record = _V1_RECORD
+        else:
+            raise ValueError(f"Unsupported event log version {version}.")
+        self._v1 = version == 1
+        # A trailing partial record (log still being written) is ignored
+        self._count = (len(self._map) - self._start) // self._record.size
+
+
+    def __len__(self) -> int:
+        return self._count
+
+
+    def __getitem__(self, index: int) -> Event:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("event index out of range")
+        return self._event(self._record.unpack_from(self._map, self._start + index * self._record.size))
+
+
+    def turn_of(self, index: int) -> int:
+        return self._record.unpack_from(self._map, self._start + index * self._record.size)[0]
+
+
+    def _event(self, record: tuple) -> Event:
+        if self._v1 and record[4] == _V1_NONE:
+            return Event(*record[:4], NO_CARD)
+        return Event(*record)
+
+
+    def seek_turn(self, turn: int) -> int:
+        # Index of the first record of the given turn or later. Turns only grow, so this is a binary search.
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.turn_of(mid) < turn:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+
+    def events(self, first_turn: int = 0, last_turn: int | None = None) -> Iterator[Event]:
+        # Records from first_turn up to and including last_turn
+        end = self._count if last_turn is None else self.seek_turn(last_turn + 1)
+        size = self._record.size
+        for record in self._record.iter_unpack(self._map[self._start + self.seek_turn(first_turn) * size:
+                                                         self._start + end * size]):
+            yield self._event(record)
+
+
+    def last_turn(self) -> int:
+        return self.turn_of(self._count - 1) if self._count else 0
+
+
+    def close(self) -> None:
+        self._map.close()
+
+
+    def __enter__(self) -> "EventLog":
+        return self
+
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
-import random
-import time
-import sys
-from typing import List
+from typing import List, Tuple
 
+from ai import ComputerStrategy, HandSizes, Observation, RandomStrategy
+from card import Card
+from animation import animator
 from deck import Deck
+from eventlog import DEAL, DISCARD, DRAW, NO_CARD, NONE, QUIT, WIN, Event, EventLog, EventLogWriter
+from odds import best_draw, rank_discards
+from piles import OpenPiles
 from player import Player
+from profiler import profiler
+from randomness import make_rng
+from renderer import TableRenderer
+from rules import STANDARD, Rules
+from state import NO_WINNER, GameState
 
 # Import Winsound for sound effects. Will only work with Windows.
 try:
@@ -23,12 +31,10 @@ def magenta(text): return f"\033[95m{text}\033[0m"
 def cyan(text): return f"\033[96m{text}\033[0m"
 def bold(text): return f"\033[1m{text}\033[0m"
 
-WINNING_SETS = 3  # First player to complete 3 sets wins
-
-# Sounds
+# Sounds are queued with the text so they play in step with it
 def play_beep(freq: int, dur: int) -> None:
     if winsound:
-        winsound.Beep(freq, dur)
+        animator.call(lambda: winsound.Beep(freq, dur))
 
 def sound_draw() -> None:
     play_beep(900, 80)
@@ -43,15 +49,25 @@ def sound_win_fanfare() -> None:
     # Simple rising triad
     for f, d in [(600, 120), (800, 120), (1000, 180)]:
         play_beep(f, d)
-        time.sleep(0.05)
+        animator.pause(0.05)
 
-# Animations
+# Animations. All output goes through the animator queue (see animation.py) so it stays in order while lines are still typing.
 def slow_print(text: str, delay: float = 0.03) -> None:
-    for ch in text:
-        sys.stdout.write(ch)
-        sys.stdout.flush()
-        time.sleep(delay)
-    print()
+    animator.type_line(text, delay)
+
+def show(text: str = "") -> None:
+    animator.line(text)
+
+def ask(prompt: str) -> str:
+    # Let queued text finish before waiting for the player. A line typed while text was still animating answers the
+    # prompt (the terminal has already echoed it, so only the prompt is shown again with it).
+    with profiler.phase("input"):
+        animator.flush()
+        line = animator.typed_ahead()
+        if line is not None:
+            print(prompt + line)
+            return line
+        return input(prompt)
 
 def animate_deal(player_name: str, card_str: str) -> None:
     slow_print(f"Dealing to {player_name}: {card_str}", delay=0.01)
@@ -60,7 +76,7 @@ def animate_turn_start(player_name: str, is_human: bool) -> None:
     icon = "🧑‍🍳" if is_human else "🤖"
     sound_ai_turn()
     slow_print(bold(magenta(f"{icon} {player_name}'s turn begins...")), delay=0.02)
-    time.sleep(0.2)
+    animator.pause(0.2)
 
 def suspense_animation(message: str = "Revealing winner", steps: int = 4) -> None:
     slow_print(bold(yellow(message)), delay=0.05)
@@ -69,14 +85,14 @@ def suspense_animation(message: str = "Revealing winner", steps: int = 4) -> Non
 
 def title_banner() -> None:
     border = "🥘" + "─" * 42 + "🥘"
-    print(bold(magenta(border)))
+    show(bold(magenta(border)))
     slow_print(bold(yellow("        HOTPOT MINIGAME - TEXT EDITION")), delay=0.04)
-    print(bold(magenta(border)))
-    print()
+    show(bold(magenta(border)))
+    show()
 
 def winning_animation(winner_name: str) -> None:
     suspense_animation("Calculating final hotpot results")
-    time.sleep(0.3)
+    animator.pause(0.3)
     lines = [
         "",
         f"   🎉🎉🎉 {winner_name.upper()} WINS!!! 🎉🎉🎉",
@@ -92,46 +108,188 @@ def winning_animation(winner_name: str) -> None:
 
 
 class Game:
-    def __init__(self, human_count: int) -> None:
-
-        if human_count < 1 or human_count > 4:
-            raise ValueError("human_count must be between 1 and 4.")
-
-        self.deck = Deck()
+    def __init__(self, human_count: int, rng=None, strategy: ComputerStrategy | None = None,
+                 seed: int | None = None, log_path: str | None = None, rules: Rules | None = None) -> None:
+
+        # Seats, deck, hand size and win threshold (see rules.py), the standard 4 seat game by default
+        self.rules = rules if rules is not None else STANDARD
+        if human_count < 1 or human_count > self.rules.num_players:
+            raise ValueError(f"human_count must be between 1 and {self.rules.num_players}.")
+
+        # Shared by the deck shuffle and the AI so a seeded random.Random (or numpy Generator) replays the same game
+        self.rng = make_rng(rng, seed)
+        self.deck = Deck(rng=self.rng, rules=self.rules)
+        # Card id of every card under the rules, and the card of every id
+        self._ids = self.rules.card_ids
+        self._cards = self.rules.cards
+        # Decision logic for every computer seat
+        self.strategy = strategy if strategy is not None else RandomStrategy()
+        if not self.strategy.supports(self.rules):
+            raise ValueError(f"{type(self.strategy).__name__} cannot play these rules, it is built for the standard deck.")
+        self.renderer = TableRenderer()
         self.players: List[Player] = []
         self._pending_winner: Player | None = None
+        # Binary event log of every deal, draw and discard (see eventlog.py), written while the game is played
+        self.log_path = log_path
+        self.log: EventLogWriter | None = None
+        self.turn = 0
+        self._seat_players(human_count)
+
+
+    def _seat_players(self, human_count: int) -> None:
+        # Humans take the first seats, computer players the rest. Also (re)builds all per seat state.
+        self.players = []
 
         # Create human players
         for i in range(1, human_count + 1):
-            self.players.append(Player(f"Player {i}", is_human=True))
+            self.players.append(Player(f"Player {i}", is_human=True, rules=self.rules))
 
         # Create AI players
-        ai_needed = 4 - human_count
+        ai_needed = self.rules.num_players - human_count
         for i in range(1, ai_needed + 1):
-            self.players.append(Player(f"Computer {i}", is_human=False))
+            self.players.append(Player(f"Computer {i}", is_human=False, rules=self.rules))
+
+        # Seat of every player, and every discard pile as card ids with the seats whose pile has cards, all kept up
+        # to date move by move so a turn never rescans the table (see piles.py)
+        self._seats = {player: seat for seat, player in enumerate(self.players)}
+        self._pile_ids: List[List[int]] = [[] for _ in self.players]
+        self.open_piles = OpenPiles(len(self.players))
 
         self.current_player_index: int = 0
+        # Per seat tallies of deck draws and discard pile steals
+        self.draw_counts = [0] * len(self.players)
+        self.steal_counts = [0] * len(self.players)
 
     # Deal cards with animation
-    def deal_initial_hands(self, cards_per_player: int = 8) -> None:
-        for _ in range(cards_per_player):
+    def deal_initial_hands(self, cards_per_player: int | None = None) -> None:
+        for player, card in self.deal(cards_per_player):
+            animate_deal(player.name, str(card))
+
+
+    # Rule actions. These change the game state without any output, so the terminal game and the network server
+    # (server.py) play by the same code.
+
+    def deal(self, cards_per_player: int | None = None) -> List[Tuple[Player, Card]]:
+        if cards_per_player is None:
+            cards_per_player = self.rules.hand_size
+        dealt = []
+        with profiler.phase("deal"):
+            for _ in range(cards_per_player):
+                for player in self.players:
+                    card = self.deck.draw()
+                    if card:
+                        player.add_card(card)
+                        self._log_event(player, DEAL, card=self._ids[card])
+                        dealt.append((player, card))
+
             for player in self.players:
-                card = self.deck.draw()
-                if card:
-                    animate_deal(player.name, str(card))
-                    player.add_card(card)
+                player.sort_hand()
+        return dealt
+
+
+    def draw_options(self, player: Player) -> List[Player]:
+        # Opponents whose discard pile can be drawn from, in seat order
+        seat = self._seats[player]
+        return [self.players[other] for other in self.open_piles.seats if other != seat]
+
+
+    def draw_from_deck(self, player: Player) -> Card | None:
+        with profiler.phase("draw"):
+            card = self.deck.draw()
+            if card:
+                player.add_card(card)
+                self._log_event(player, DRAW, card=self._ids[card])
+                profiler.count("deck_draws")
+        return card
+
+
+    def take_discard(self, player: Player, opponent: Player) -> Card | None:
+        with profiler.phase("draw"):
+            card = player.take_from_discard(opponent)
+            if card:
+                source = self._seats[opponent]
+                self._pile_taken(source)
+                self._log_event(player, DRAW, source, self._ids[card])
+                profiler.count("steals")
+        return card
+
+
+    def check_win(self, player: Player) -> bool:
+        # Immediate win check after a draw. The game ends once the winner's turn is over.
+        with profiler.phase("set_check"):
+            won = player.sets_in_hand_count() >= self.rules.winning_sets
+        profiler.count("set_checks")
+        if won:
+            self._pending_winner = player
+            self._log_event(player, WIN)
+            return True
+        return False
+
+
+    def discard(self, player: Player, index: int) -> Card:
+        with profiler.phase("discard"):
+            card = player.discard_card_by_index(index)
+            self._pile_added(self._seats[player], card)
+            self._log_event(player, DISCARD, card=self._ids[card])
+        return card
+
+
+    def _pile_taken(self, seat: int) -> None:
+        pile = self._pile_ids[seat]
+        pile.pop()
+        if not pile:
+            self.open_piles.emptied(seat)
+
+
+    def _pile_added(self, seat: int, card: Card) -> None:
+        self._pile_ids[seat].append(self._ids[card])
+        self.open_piles.opened(seat)
+
+
+    def computer_draw(self, player: Player) -> Tuple[Player | None, Card | None]:
+        # The strategy's draw, as (opponent stolen from or None for the deck, card drawn)
+        with profiler.phase("ai_think"):
+            target = self.strategy.choose_draw(self._observation(player), self.rng)
+        if target is not None:
+            opponent = self.players[target]
+            return opponent, self.take_discard(player, opponent)
+        return None, self.draw_from_deck(player)
+
+
+    def computer_discard(self, player: Player) -> Card:
+        # Strategy picks a card to discard (hand order does not matter, so no sort is needed)
+        with profiler.phase("ai_think"):
+            cid = self.strategy.choose_discard(self._observation(player), self.rng)
+        return self.discard(player, player.hand.index(self._cards[cid]))
 
-        for player in self.players:
-            player.sort_hand()
+
+    def end_turn(self) -> None:
+        self.current_player_index = (self.current_player_index + 1) % len(self.players)
+
+
+    @property
+    def winner(self) -> Player | None:
+        return self._pending_winner
 
 
     # Main Game Loop
     def play(self) -> None:
         title_banner()
-        print("The first player to complete 3 sets of 3 cards wins.")
-        print("Up to 4 players may play; others are computer controlled.")
-        print("Type 'q' on your turn to quit.\n")
+        show(f"The first player to complete {self.rules.winning_sets} sets of {self.rules.ingredients} cards wins.")
+        show(f"Up to {self.rules.num_players} players may play; others are computer controlled.")
+        show("Type 'q' on your turn to quit.\n")
+
+        if self.log_path is not None:
+            self.log = EventLogWriter(self.log_path, self.rules, sum(p.is_human for p in self.players),
+                                      [self._ids[card] for card in self.deck.cards])
+        try:
+            self._play_rounds()
+        finally:
+            if self.log is not None:
+                self.log.close()
 
+
+    def _play_rounds(self) -> None:
         self.deal_initial_hands()
         winner: Player | None = None
 
@@ -148,16 +306,23 @@ class Game:
             if self.deck.remaining() <= 0:
                 break
 
-            animate_turn_start(current.name, current.is_human)
-            self._print_table_state(current)
+            self.turn += 1
+            # Human turns include the time spent waiting for input (also timed on its own as the input phase)
+            with profiler.phase("human_turn" if current.is_human else "computer_turn"):
+                animate_turn_start(current.name, current.is_human)
+                self._print_table_state(current)
 
-            if current.is_human:
-                quit_game = self._human_turn(current)
-                if quit_game:
-                    print(f"{current.name} has quit the game.")
-                    return
-            else:
-                self._computer_turn(current)
+                if current.is_human:
+                    quit_game = self._human_turn(current)
+                else:
+                    quit_game = False
+                    self._computer_turn(current)
+            if quit_game:
+                self._log_event(current, QUIT)
+                show(f"{current.name} has quit the game.")
+                self.renderer.close()
+                animator.flush()
+                return
 
             # END OF TURN — check win condition
             if self._pending_winner is not None and self._pending_winner == current:
@@ -165,156 +330,310 @@ class Game:
                 break
 
             # Rotate turn normally
-            self.current_player_index = (self.current_player_index + 1) % len(self.players)
+            self.end_turn()
 
+        self.renderer.close()
         self._print_final_results(winner)
+        animator.flush()
+
+
+    # Headless mode for AI vs AI balance runs
+    @staticmethod
+    def simulate(seed: int | None = None, num_players: int = 4):
+        # Play one computer-only game with no output, sleeps or sounds and return a SimulationResult
+        from simulation import SimulationGame
+        return SimulationGame(num_players=num_players, seed=seed).run()
 
 
     # Display game state
     def _print_table_state(self, current: Player) -> None:
-        print(bold(magenta("🥘" + "─" * 40 + "🥘")))
-        print(bold(yellow(f"Current Turn: {current.name}")))
-        print(f"Deck has {self.deck.remaining()} cards remaining.\n")
+        # Only the lines that changed since the last turn reach the terminal (see renderer.py)
+        with profiler.phase("render"):
+            self.renderer.render(self._table_lines(current))
+
+    def _table_lines(self, current: Player, viewer: Player | None = None) -> List[str]:
+        # With a viewer (network play) only that player's hand is shown, other humans are shown like opponents
+        lines = [
+            bold(magenta("🥘" + "─" * 40 + "🥘")),
+            bold(yellow(f"Current Turn: {current.name}")),
+            f"Deck has {self.deck.remaining()} cards remaining.\n",
+        ]
 
         for player in self.players:
             top = player.top_discard()
 
-            if player.is_human:
-                print(bold(green(f"{player.name} (HUMAN)")))
-                print(f"Hand size: {player.hand_size()}, Sets: {len(player.find_sets_in_hand())}")
-                print(cyan("Hand:"))
-                print(player.describe_hand())
-                print(cyan("\nSets:"))
-                print(player.describe_sets())
+            if player.is_human and viewer is not None and player is not viewer:
+                lines.append(bold(green(f"{player.name} (HUMAN)")))
+                lines.append(f"Hand size: {player.hand_size()}, Sets: {player.sets_in_hand_count()}")
+                lines.append(f"Top discard: {yellow(str(top))}" if top else "No discards yet.")
+            elif player.is_human:
+                lines.append(bold(green(f"{player.name} (HUMAN)")))
+                lines.append(f"Hand size: {player.hand_size()}, Sets: {player.sets_in_hand_count()}")
+                lines.append(cyan("Hand:"))
+                lines.append(player.describe_hand())
+                lines.append(cyan("\nSets:"))
+                lines.append(player.describe_sets())
             else:
-                print(bold(blue(f"{player.name} (AI)")))
-                print(f"Hand size: {player.hand_size()}, Sets: {len(player.find_sets_in_hand())}")
+                lines.append(bold(blue(f"{player.name} (AI)")))
+                lines.append(f"Hand size: {player.hand_size()}, Sets: {player.sets_in_hand_count()}")
                 if top:
-                    print(f"Top discard: {yellow(str(top))}")
+                    lines.append(f"Top discard: {yellow(str(top))}")
                 else:
-                    print("No discards yet.")
+                    lines.append("No discards yet.")
+
+            lines.append(magenta("─" * 60))
 
-            print(magenta("─" * 60))
+        return lines
 
     # Human turn logic
     def _human_turn(self, player: Player) -> bool:
-        print(bold("You must first draw one card, then discard one."))
+        show(bold("You must first draw one card, then discard one."))
 
-        print(bold(cyan("Draw Options:")))
-        print(green("  1 - Draw from the deck"))
+        show(bold(cyan("Draw Options:")))
+        show(green("  1 - Draw from the deck"))
 
         # Build consecutive discard-pile options
         discard_options = {}
-        option_num = 2
 
-        for opp in self.players:
-            if opp is not player and opp.top_discard():
-                discard_options[option_num] = opp
-                print(f"  {option_num} - Take from {opp.name}'s discard pile")
-                option_num += 1
+        for option_num, opp in enumerate(self.draw_options(player), 2):
+            discard_options[option_num] = opp
+            show(f"  {option_num} - Take from {opp.name}'s discard pile")
 
-        print(yellow("  q - Quit game"))
+        # The odds engine behind the hints counts cards of the standard deck only
+        hints = self.rules.standard_cards
+        if hints:
+            show(yellow("  h - Hint"))
+        show(yellow("  q - Quit game"))
 
         # DRAW LOOP
         while True:
-            choice = input("Choose where to draw from: ").strip().lower()
+            choice = ask("Choose where to draw from: ").strip().lower()
 
             if choice == "q":
                 return True
 
+            if choice == "h":
+                show(self._draw_hint(player, discard_options) if hints else yellow("No hints for this deck."))
+                continue
+
             if choice == "1":
-                drawn = self.deck.draw()
+                drawn = self.draw_from_deck(player)
                 if drawn:
                     sound_draw()
                     slow_print(green(f"You drew: {drawn}"), delay=0.02)
-                    player.add_card(drawn)
                 break
 
             if choice.isdigit():
                 num = int(choice)
                 if num in discard_options:
                     opponent = discard_options[num]
-                    card = player.take_from_discard(opponent)
+                    card = self.take_discard(player, opponent)
                     sound_draw()
                     slow_print(green(f"You took: {card} from {opponent.name}"), delay=0.02)
                     break
 
-            print(red("Invalid choice, try again."))
+            show(red("Invalid choice, try again."))
 
         # IMMEDIATE WIN CHECK AFTER DRAW
-        player.sort_hand()
-        sets_found = player.find_sets_in_hand()
-        if len(sets_found) >= WINNING_SETS:
-            self._pending_winner = player
+        if self.check_win(player):
             return False
 
         # DISCARD SECTION
         player.sort_hand()
-        print(cyan("\nYour updated hand:"))
-        print(player.describe_hand())
+        show(cyan("\nYour updated hand:"))
+        show(player.describe_hand())
 
         while True:
-            disc = input("Choose a card index to discard: ").strip().lower()
+            disc = ask("Choose a card index to discard (h for a hint): " if hints
+                       else "Choose a card index to discard: ").strip().lower()
             if disc == "q":
                 return True
+            if disc == "h":
+                show(self._discard_hint(player) if hints else yellow("No hints for this deck."))
+                continue
             if disc.isdigit():
                 idx = int(disc)
                 if 0 <= idx < player.hand_size():
-                    removed = player.discard_card_by_index(idx)
+                    removed = self.discard(player, idx)
                     sound_discard()
                     slow_print(red(f"You discard: {removed}"), delay=0.02)
                     break
-            print(red("Invalid index."))
+            show(red("Invalid index."))
 
-        input("Press Enter to end your turn...")
+        ask("Press Enter to end your turn...")
         return False
 
+    # Hints from the draw odds engine (see odds.py)
+    def _draw_hint(self, player: Player, discard_options: dict) -> str:
+        seat, value, deck_value = best_draw(self._observation(player))
+        lines = [cyan(f"Hint: drawing from the deck is worth {deck_value:.2f} expected sets.")]
+        for num, opp in discard_options.items():
+            if self._seats[opp] == seat:
+                lines.append(cyan(f"Hint: option {num}, {opp.name}'s {opp.top_discard()}, is better at {value:.2f}."))
+        if seat is None:
+            lines.append(cyan("Hint: draw from the deck (option 1)."))
+        return "\n".join(lines)
+
+    def _discard_hint(self, player: Player) -> str:
+        lines = [cyan("Hint: expected sets after each discard, best first:")]
+        for cid, value in rank_discards(self._observation(player))[:3]:
+            card = self._cards[cid]
+            lines.append(cyan(f"  [{player.hand.index(card)}] {card} -> {value:.2f}"))
+        return "\n".join(lines)
+
     # AI Turn Logic
     def _computer_turn(self, player: Player) -> None:
         sound_ai_turn()
         slow_print(blue(f"{player.name} is taking a turn..."), delay=0.02)
 
-        steal_candidates = [p for p in self.players if p is not player and p.top_discard()]
+        opponent, card = self.computer_draw(player)
 
-        if steal_candidates and random.random() < 0.4:
-            opponent = random.choice(steal_candidates)
-            card = player.take_from_discard(opponent)
+        if opponent is not None:
             sound_draw()
             slow_print(blue(f"{player.name} takes from {opponent.name}'s discard: {card}"), delay=0.02)
-        else:
-            card = self.deck.draw()
-            if card:
-                sound_draw()
-                player.add_card(card)
-                slow_print(blue(f"{player.name} draws from deck."), delay=0.02)
+        elif card:
+            sound_draw()
+            slow_print(blue(f"{player.name} draws from deck."), delay=0.02)
 
         # IMMEDIATE WIN CHECK AFTER DRAW
-        player.sort_hand()
-        sets_found = player.find_sets_in_hand()
-        if len(sets_found) >= WINNING_SETS:
-            self._pending_winner = player
+        if self.check_win(player):
             return
 
-        # AI discards random card
         if player.hand_size() > 0:
-            idx = random.randrange(player.hand_size())
-            removed = player.discard_card_by_index(idx)
+            removed = self.computer_discard(player)
             sound_discard()
             slow_print(red(f"{player.name} discards: {removed}"), delay=0.02)
 
+    def _log_event(self, player: Player, action: int, source: int = NONE, card: int = NO_CARD) -> None:
+        seat = self._seats[player]
+        if action == DRAW:
+            if source == NONE:
+                self.draw_counts[seat] += 1
+            else:
+                self.steal_counts[seat] += 1
+        if self.log is not None:
+            self.log.record(self.turn, seat, action, source, card)
+
+
+    def result(self):
+        # This game's outcome as a SimulationResult, the record type of the results store (see results_store.py)
+        from simulation import SimulationResult
+        return SimulationResult(
+            winner=self._seats[self._pending_winner] if self._pending_winner is not None else None,
+            turns=self.turn,
+            deck_remaining=self.deck.remaining(),
+            sets=tuple(p.sets_in_hand_count() for p in self.players),
+            scores=tuple(p.best_score_in_hand() for p in self.players),
+            category_sets=tuple(p.counts.category_sets() for p in self.players),
+            draws=tuple(self.draw_counts),
+            steals=tuple(self.steal_counts),
+        )
+
+
+    # Snapshots (see state.py)
+
+    def snapshot(self) -> GameState:
+        return GameState(
+            deck=tuple(self._ids[card] for card in self.deck.cards),
+            hands=tuple(bytes(p.counts.counts) for p in self.players),
+            discards=tuple(tuple(pile) for pile in self._pile_ids),
+            current=self.current_player_index,
+            turn=self.turn,
+            winner=self._seats[self._pending_winner] if self._pending_winner is not None else NO_WINNER,
+            draws=tuple(self.draw_counts),
+            steals=tuple(self.steal_counts),
+            rules=self.rules,
+        )
+
+
+    def restore(self, state: GameState) -> None:
+        # Put the table back as it was in the snapshot. Hands come back sorted.
+        if state.rules != self.rules:
+            raise ValueError("The snapshot is for different rules or a different number of players.")
+        cards = self._cards
+        self.deck.cards[:] = [cards[cid] for cid in state.deck]
+        for player, hand, pile in zip(self.players, state.hands, state.discards):
+            player.load_hand(hand)
+            player.discard_pile = [cards[cid] for cid in pile]
+        self._pile_ids = [list(pile) for pile in state.discards]
+        self.open_piles.reset(self._pile_ids)
+        self.current_player_index = state.current
+        self.turn = state.turn
+        self._pending_winner = self.players[state.winner] if state.winner != NO_WINNER else None
+        self.draw_counts = list(state.draws)
+        self.steal_counts = list(state.steals)
+
+
+    # Rebuild a logged game
+    @classmethod
+    def replay(cls, path: str, turn: int | None = None) -> "Game":
+        # Game state at the end of the given turn (the last turn when None), rebuilt from the log records alone.
+        # Turn 0 is the deal. The log holds the rules the game was played by.
+        with EventLog(path) as log:
+            game = cls(human_count=1, seed=0, rules=log.rules)
+            # Seated as logged, a log of computer players only replays with no human seat
+            game._seat_players(log.human_count)
+            game.deck.cards[:] = [game._cards[cid] for cid in log.deck_order]
+            last = None
+            for event in log.events(0, turn):
+                game._apply_event(event)
+                last = event
+        for player in game.players:
+            player.sort_hand()
+        # Whoever moves next, or the winner, who ends the game on their own turn
+        if last is not None and last.turn > 0:
+            game.turn = last.turn
+            if game._pending_winner is not None:
+                game.current_player_index = last.player
+            else:
+                game.current_player_index = (last.player + 1) % len(game.players)
+        return game
+
+
+    def _apply_event(self, event: Event) -> None:
+        player = self.players[event.player]
+        if event.action == DEAL or (event.action == DRAW and event.source == NONE):
+            card = self.deck.draw()
+            if card is None or self._ids[card] != event.card:
+                raise ValueError(f"Event log does not match its deck at turn {event.turn}.")
+            player.add_card(card)
+            if event.action == DRAW:
+                self.draw_counts[event.player] += 1
+        elif event.action == DRAW:
+            player.take_from_discard(self.players[event.source])
+            self._pile_taken(event.source)
+            self.steal_counts[event.player] += 1
+        elif event.action == DISCARD:
+            card = player.discard_card_by_index(player.hand.index(self._cards[event.card]))
+            self._pile_added(event.player, card)
+        elif event.action == WIN:
+            self._pending_winner = player
+
+
+    def _observation(self, player: Player) -> Observation:
+        # The table as the computer player sees it, with cards as card ids
+        return Observation(
+            seat=self._seats[player],
+            counts=player.counts.counts,
+            discard_piles=self._pile_ids,
+            hand_sizes=HandSizes(len(self.players), self.rules.hand_size, self._seats[player], player.hand_size()),
+            deck_remaining=self.deck.remaining(),
+            open_piles=self.open_piles.seats,
+            rules=self.rules,
+        )
+
     # End game results
     def _print_final_results(self, winner: Player | None) -> None:
-        print("\n" + bold(magenta("🥘" + "═" * 40 + "🥘")))
-        print(bold("Game over!\n"))
+        show("\n" + bold(magenta("🥘" + "═" * 40 + "🥘")))
+        show(bold("Game over!\n"))
 
-        # Recalculate sets logically at the end
+        # Sets and score are read from each player's live optimal index
         for p in self.players:
-            final_sets = p.find_sets_in_hand()
-            print(f"{p.name} - sets: {len(final_sets)}, hand size: {p.hand_size()}")
+            show(f"{p.name} - sets: {p.sets_in_hand_count()}, score: {p.best_score_in_hand()}, hand size: {p.hand_size()}")
 
         if winner is None:
-            print(red("No one reached 3 sets before deck exhaustion. Draw."))
+            show(red(f"No one reached {self.rules.winning_sets} sets before deck exhaustion. Draw."))
         else:
             winning_animation(winner.name)
 
-        print(bold(magenta("🥘" + "═" * 40 + "🥘")))
+        show(bold(magenta("🥘" + "═" * 40 + "🥘")))
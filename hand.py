@@ -0,0 +1,79 @@
+# Define the count based hand: a fixed array holding how many copies of each card id a player has (24 slots in the standard game). Set detection and lookups read the counts instead of scanning the hand.
+
+from __future__ import annotations
+
+from typing import Iterator, List
+from rules import STANDARD, Rules
+
+
+class HandCounts:
+    __slots__ = ("rules", "counts", "keys", "size", "sets", "score")
+
+    def __init__(self, rules: Rules = STANDARD) -> None:
+        self.rules = rules
+        self.counts: List[int] = [0] * rules.num_card_types
+        # One solver key per category (see solver.CategoryTable), so a change is a constant time table lookup
+        self.keys: List[int] = [0] * rules.categories
+        self.size: int = 0
+        # Live optimal solution (see solver.py): most disjoint sets and the best score for them, updated on every add / remove
+        self.sets: int = 0
+        self.score: int = 0
+
+
+    def _change(self, cid: int, delta: int) -> None:
+        # Only the changed card's category can change its solution, so swap that category's cached answer
+        rules = self.rules
+        table = rules.table
+        cat = cid // rules.ingredients
+        old = self.keys[cat]
+        new = old + delta * rules.key_steps[cid]
+        self.keys[cat] = new
+        self.counts[cid] += delta
+        self.sets += table.sets[new] - table.sets[old]
+        self.score += table.scores[new] - table.scores[old]
+        self.size += delta
+
+
+    def add(self, cid: int) -> None:
+        self._change(cid, 1)
+
+
+    def remove(self, cid: int) -> None:
+        if self.counts[cid] == 0:
+            raise ValueError(f"card id {cid} is not in the hand")
+        self._change(cid, -1)
+
+
+    def has(self, cid: int) -> bool:
+        return self.counts[cid] > 0
+
+
+    def clear(self) -> None:
+        self.counts = [0] * self.rules.num_card_types
+        self.keys = [0] * self.rules.categories
+        self.size = 0
+        self.sets = 0
+        self.score = 0
+
+
+    def ids_in_order(self) -> Iterator[int]:
+        # Every card id in the hand in sorted order, repeated once per copy
+        for cid, count in enumerate(self.counts):
+            for _ in range(count):
+                yield cid
+
+
+    # Set detection over the counts (one slot per card type, independent of hand size)
+
+    def category_sets(self) -> int:
+        # How many of the optimal sets are category sets
+        table = self.rules.table
+        return sum(table.category_sets[key] for key in self.keys)
+
+
+    def sets_count(self) -> int:
+        return self.sets
+
+
+    def best_score(self) -> int:
+        return self.score
@@ -1,6 +1,37 @@
+
+import argparse
+import os
+
+from animation import animator
 from game import Game
 
-def main() -> None:
+# Computer players selectable with --ai
+STRATEGIES = ("random", "odds", "endgame", "montecarlo", "montecarlo-parallel", "tabular")
+
+
+def make_strategy(name: str, workers: int | None = None):
+    # workers: processes for montecarlo-parallel, one per CPU by default
+    if name == "odds":
+        from odds import OddsStrategy
+        return OddsStrategy()
+    if name == "endgame":
+        from endgame import EndgameStrategy
+        return EndgameStrategy()
+    if name == "tabular":
+        from policy import TabularStrategy
+        return TabularStrategy.load()
+    if name == "montecarlo":
+        from ai import MonteCarloStrategy
+        return MonteCarloStrategy()
+    if name == "montecarlo-parallel":
+        from parallel_ai import ParallelMonteCarloStrategy
+        return ParallelMonteCarloStrategy(workers=workers)
+    from ai import RandomStrategy
+    return RandomStrategy()
+
+
+def main(log_path: str | None = None, ai: str = "random", profile_path: str | None = None,
+         ai_workers: int | None = None) -> None:
     print("Welcome to the Hotpot Card Game!")
     print("How many human players? (1 to 4)")
 
@@ -13,9 +44,171 @@ def main() -> None:
             print("Invalid input. Please enter 1, 2, 3, or 4.")
 
 
-    game = Game(human_count=n)
-    game.play()
+    game = Game(human_count=n, log_path=log_path, strategy=make_strategy(ai, ai_workers))
+    if profile_path is None:
+        game.play()
+        return
 
-if __name__ == "__main__":
-    main()
+    # Phase timings, counters and latency histograms of the whole game, written even when it is quit or interrupted
+    from profiler import profiler
+
+    profiler.enable()
+    try:
+        game.play()
+    finally:
+        animator.flush()
+        profiler.disable()
+        profiler.export(profile_path)
+        print(f"Wrote the profile to {profile_path}")
+
+
+def simulate(args: argparse.Namespace) -> None:
+    from tournament import run_tournament
+
+    stats = run_tournament(args.games, workers=args.workers, seed=args.seed, num_players=args.players,
+                           store=args.store, precision=args.precision)
+    print(stats.summary())
+
+
+def sweep(args: argparse.Namespace) -> None:
+    from sweep import format_table, parse_grid, run_sweep, write_csv
+
+    def report(entries) -> None:
+        running = sum(entry.status == "running" for entry in entries)
+        print(f"{sum(entry.stats.games for entry in entries)} games played, {running} configurations still running")
+
+    entries = run_sweep(parse_grid(args.grid), max_games=args.games, workers=args.workers, seed=args.seed,
+                        objective=args.objective, precision=args.precision, turn_precision=args.turn_precision,
+                        report=report)
+    print(format_table(entries))
+    if args.out:
+        write_csv(args.out, entries)
+        print(f"Wrote {len(entries)} configurations to {args.out}")
+
+
+def results(args: argparse.Namespace) -> None:
+    from results_store import ResultsStore
+
+    print(ResultsStore(args.store).summary())
+
+
+def replay(args: argparse.Namespace) -> None:
+    from eventlog import EventLog
+
+    with EventLog(args.log) as log:
+        if args.events:
+            for event in log.events(0, args.turn):
+                print(event.describe())
+
+    game = Game.replay(args.log, args.turn)
+    game.renderer.enabled = False
+    print(f"State after turn {game.turn}:")
+    game.renderer.render(game._table_lines(game.players[game.current_player_index]))
+    animator.flush()
 
+
+def serve(args: argparse.Namespace) -> None:
+    from server import run_server
+
+    run_server(args.host, args.port, args.timeout)
+
+
+def opening_table(args: argparse.Namespace) -> None:
+    from opening_odds import DEFAULT_PATH, build_table
+
+    path = args.out or DEFAULT_PATH
+    hands = build_table(path, workers=args.workers)
+    print(f"Wrote {hands} starting hands to {path}")
+
+
+def train(args: argparse.Namespace) -> None:
+    from policy import DEFAULT_PATH, train as train_policy
+
+    path = args.out or DEFAULT_PATH
+    train_policy(args.iterations, args.games, workers=args.workers, num_players=args.players, seed=args.seed, path=path)
+    print(f"Wrote the policy table to {path}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Hotpot Card Game")
+    commands = parser.add_subparsers(dest="command")
+
+    sim = commands.add_parser("simulate", help="Run headless computer-only games and print totals")
+    sim.add_argument("--games", type=int, default=10_000, help="Number of games to play")
+    sim.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    sim.add_argument("--seed", type=int, default=0, help="Base seed, the same seed gives the same totals")
+    sim.add_argument("--players", type=int, default=4, help="Computer players per game")
+    sim.add_argument("--precision", type=float, default=None,
+                     help="Stop early once every win rate and the draw rate is known to within this (e.g. 0.005)")
+    sim.add_argument("--store", default=None, help="Also append every game to the results store in this folder")
+    sim.set_defaults(handler=simulate)
+
+    swp = commands.add_parser("sweep", help="Compare rule and computer player settings over a grid of configurations")
+    swp.add_argument("--grid", action="append", required=True,
+                     help="A parameter and its values, e.g. steal_probability=0.2,0.4,0.6 or hand_size=7,8,9 "
+                          "(repeat for more parameters, every combination is played)")
+    swp.add_argument("--games", type=int, default=100_000, help="Most games per configuration")
+    swp.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    swp.add_argument("--seed", type=int, default=0, help="Base seed, every configuration plays the same seeded games")
+    swp.add_argument("--objective", choices=("wins", "short"), default="wins",
+                     help="Stop configurations clearly worse at: wins (games with a winner) or short (game length)")
+    swp.add_argument("--precision", type=float, default=0.005,
+                     help="A configuration is resolved once its win rate is known to within this")
+    swp.add_argument("--turn-precision", type=float, default=0.5,
+                     help="... and its average game length is known to within this many turns")
+    swp.add_argument("--out", default=None, help="Also write the table to this CSV file")
+    swp.set_defaults(handler=sweep)
+
+    srv = commands.add_parser("serve", help="Host network tables, players join with client.py")
+    srv.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    srv.add_argument("--port", type=int, default=7878, help="Port to listen on")
+    srv.add_argument("--timeout", type=float, default=60.0, help="Seconds per move before the computer moves instead")
+    srv.set_defaults(handler=serve)
+
+    ops = commands.add_parser("opening-table", help="Build the exact starting hand odds table (requires NumPy)")
+    ops.add_argument("--out", default=None, help="Output file (default: opening_odds.bin next to the game)")
+    ops.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    ops.set_defaults(handler=opening_table)
+
+    trn = commands.add_parser("train", help="Learn the tabular computer player by self-play (requires NumPy)")
+    trn.add_argument("--iterations", type=int, default=20, help="Rounds of self-play and table updates")
+    trn.add_argument("--games", type=int, default=2000, help="Games per iteration")
+    trn.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    trn.add_argument("--players", type=int, default=4, help="Players per self-play game")
+    trn.add_argument("--seed", type=int, default=0, help="Base seed")
+    trn.add_argument("--out", default=None, help="Output file (default: policy.bin next to the game)")
+    trn.set_defaults(handler=train)
+
+    res = commands.add_parser("results", help="Summarize a results store written by simulate --store")
+    res.add_argument("store", help="Results store folder")
+    res.set_defaults(handler=results)
+
+    rep = commands.add_parser("replay", help="Rebuild the table of a logged game at any turn")
+    rep.add_argument("log", help="Event log written with --log")
+    rep.add_argument("--turn", type=int, default=None, help="Show the table after this turn (default: the last one)")
+    rep.add_argument("--events", action="store_true", help="Also list every event up to that turn")
+    rep.set_defaults(handler=replay)
+
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Animation speed for interactive play: 1 normal, 2 twice as fast, 0 instant")
+    parser.add_argument("--ai", choices=STRATEGIES, default="random",
+                        help="Computer player: random (the original), odds (card counting), endgame (odds with an exact "
+                             "search once the deck runs low), montecarlo (search), montecarlo-parallel (the same search over "
+                             "worker processes) or tabular (learned with the train command)")
+    parser.add_argument("--ai-workers", type=int, default=None, metavar="N",
+                        help="Worker processes for --ai montecarlo-parallel (default: one per CPU)")
+    parser.add_argument("--log", default=None, help="Record the interactive game to this event log file")
+    parser.add_argument("--profile", default=None, metavar="PATH",
+                        help="Time the interactive game's phases (deal, draw, set check, discard, render, AI think ...) "
+                             "and write the timings, counters and latency histograms to this JSON file")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command is None:
+        animator.set_speed(args.speed)
+        main(args.log, args.ai, args.profile, args.ai_workers)
+    else:
+        args.handler(args)
@@ -0,0 +1,169 @@
+# Draw odds from public card counting. A seat knows its own hand and every discard pile, the other copies of each card
+# (see Observation.unseen) are somewhere in the deck or the other hands. The deck is a uniformly random part of those
+# unseen cards, so its next k cards are a uniform sample of them and set completion odds are exact hypergeometric sums.
+#
+# A hand is valued by its sets plus the expected number of its open candidate sets (a pair or single of one ingredient
+# towards three of a kind, an incomplete category set) that k more draws would complete. Values are cached per category
+# on (held counts, unseen counts, pool size, k), so ranking every discard or draw is a few cache lookups.
+
+from __future__ import annotations
+
+from functools import lru_cache
+from itertools import combinations
+from math import comb
+from typing import List, Sequence, Tuple
+
+from ai import ComputerStrategy, Observation
+from rules import Rules
+from card import NUM_CARD_TYPES
+from solver import CATEGORY_SETS, WINNING_SETS, category_key
+
+DEFAULT_DRAWS = 6       # Draws looked ahead when a caller gives no horizon
+WIN_VALUE = 100.0       # Value of a winning hand, above any sets plus odds
+
+
+def at_least_probability(unseen: int, need: int, pool: int, draws: int) -> float:
+    # P(at least need of the unseen copies of one card turn up in draws cards taken from pool unseen cards)
+    if need <= 0:
+        return 1.0
+    draws = min(draws, pool)
+    if need > min(unseen, draws):
+        return 0.0
+    total = comb(pool, draws)
+    return sum(comb(unseen, x) * comb(pool - unseen, draws - x) for x in range(need, min(unseen, draws) + 1)) / total
+
+
+def all_present_probability(unseen: Sequence[int], pool: int, draws: int) -> float:
+    # P(every listed card turns up at least once in draws cards from pool), by inclusion-exclusion over the missing ones
+    draws = min(draws, pool)
+    total = comb(pool, draws)
+    p = 0.0
+    for size in range(len(unseen) + 1):
+        for subset in combinations(unseen, size):
+            p += (-1) ** size * comb(pool - sum(subset), draws)
+    return p / total
+
+
+@lru_cache(maxsize=1 << 16)
+def category_odds(held: Tuple[int, int, int], unseen: Tuple[int, int, int], pool: int, draws: int) -> float:
+    # Expected number of this category's open candidate sets completed within draws cards
+    if not any(held) or draws <= 0 or pool <= 0:
+        return 0.0
+    expected = 0.0
+    # Three of a kind from a card already held, counting copies not already in one
+    for count, hidden in zip(held, unseen):
+        if count % 3:
+            expected += at_least_probability(hidden, 3 - count % 3, pool, draws)
+    # A category set from the ingredients held, needing one of each missing ingredient
+    missing = [hidden for count, hidden in zip(held, unseen) if count == 0]
+    if missing:
+        expected += all_present_probability(missing, pool, draws)
+    return expected
+
+
+def hand_sets(counts: Sequence[int]) -> int:
+    return sum(CATEGORY_SETS[category_key(counts[base], counts[base + 1], counts[base + 2])]
+               for base in range(0, NUM_CARD_TYPES, 3))
+
+
+class OddsTable:
+    # Values for one hand seen from one seat. Build one per decision, the category values behind it are cached globally.
+
+    def __init__(self, counts: Sequence[int], unseen: Sequence[int], draws: int = DEFAULT_DRAWS) -> None:
+        self.counts = list(counts)
+        self.unseen = list(unseen)
+        self.pool = sum(unseen)
+        self.draws = draws
+        self.values = [self.category_value(self.counts[base:base + 3], base) for base in range(0, NUM_CARD_TYPES, 3)]
+        self.sets = [CATEGORY_SETS[category_key(*self.counts[base:base + 3])] for base in range(0, NUM_CARD_TYPES, 3)]
+        self.total = sum(self.values)
+        # Value lost by discarding each held card, only its own category changes
+        self.losses = {}
+        for cid in range(NUM_CARD_TYPES):
+            if self.counts[cid]:
+                base = cid - cid % 3
+                held = self.counts[base:base + 3]
+                held[cid - base] -= 1
+                self.losses[cid] = self.values[base // 3] - self.category_value(held, base)
+
+
+    def category_value(self, held: Sequence[int], base: int) -> float:
+        # Sets plus expected completions for one category holding the given three counts
+        return CATEGORY_SETS[category_key(*held)] + category_odds(
+            tuple(held), (self.unseen[base], self.unseen[base + 1], self.unseen[base + 2]), self.pool, self.draws)
+
+
+    def hand_value(self) -> float:
+        return WIN_VALUE if sum(self.sets) >= WINNING_SETS else self.total
+
+
+    def rank_discards(self) -> List[Tuple[int, float]]:
+        # (card id, value of the hand after discarding it) for every distinct card held, best discard first
+        ranked = [(cid, self.total - loss) for cid, loss in self.losses.items()]
+        ranked.sort(key=lambda item: -item[1])
+        return ranked
+
+
+    def value_after_draw(self, cid: int) -> float:
+        # Value of the hand after drawing cid and making the best discard (or winning on the spot)
+        base = cid - cid % 3
+        cat = base // 3
+        held = self.counts[base:base + 3]
+        held[cid - base] += 1
+        if sum(self.sets) - self.sets[cat] + CATEGORY_SETS[category_key(*held)] >= WINNING_SETS:
+            return WIN_VALUE
+
+        rest = self.total - self.values[cat]
+        drawn_value = self.category_value(held, base)
+        # Best discard from another category, or from the drawn card's own category
+        outside = [loss for other, loss in self.losses.items() if other // 3 != cat]
+        best = rest + drawn_value - min(outside) if outside else float("-inf")
+        for i in range(3):
+            if held[i]:
+                held[i] -= 1
+                best = max(best, rest + self.category_value(held, base))
+                held[i] += 1
+        return best
+
+
+    def deck_value(self) -> float:
+        # Expected value of drawing from the deck: every unseen card is equally likely to be on top
+        if not self.pool:
+            return 0.0
+        return sum(hidden * self.value_after_draw(cid) for cid, hidden in enumerate(self.unseen) if hidden) / self.pool
+
+
+def draws_left(obs: Observation) -> int:
+    # Roughly how many more deck draws this seat gets before the deck runs out
+    return max(1, min(DEFAULT_DRAWS, obs.deck_remaining // max(len(obs.hand_sizes), 1)))
+
+
+def best_draw(obs: Observation) -> Tuple[int | None, float, float]:
+    # (seat to steal from or None for the deck, that choice's value, the deck's value)
+    table = OddsTable(obs.counts, obs.unseen(), draws_left(obs))
+    deck = table.deck_value()
+    choice, value = None, deck
+    for seat in obs.steal_options():
+        steal = table.value_after_draw(obs.discard_piles[seat][-1])
+        if steal > value:
+            choice, value = seat, steal
+    return choice, value, deck
+
+
+def rank_discards(obs: Observation) -> List[Tuple[int, float]]:
+    return OddsTable(obs.counts, obs.unseen(), draws_left(obs)).rank_discards()
+
+
+class OddsStrategy(ComputerStrategy):
+    # Fast heuristic player: steals when the top card beats the expected deck draw, discards what hurts the odds least
+
+    def supports(self, rules: Rules) -> bool:
+        return rules.standard_cards
+
+
+    def choose_draw(self, obs: Observation, rng) -> int | None:
+        return best_draw(obs)[0]
+
+
+    def choose_discard(self, obs: Observation, rng) -> int:
+        return rank_discards(obs)[0][0]
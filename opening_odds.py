@@ -0,0 +1,221 @@
+# Exact starting hand table. Every distinct 8 card hand (a count of 0-4 for each of the 24 card ids) gets a slot at its
+# combinatorial rank, holding the exact chance of being dealt it, its optimal set count and how many more cards it is
+# away from a win. The table is built offline over a process pool and read back through a memory map. It is an analysis
+# table, no computer player reads it.
+#
+# Ranks follow ascending order of the 24 slot count vector, so a hand's rank is a sum of precomputed suffix counts
+# (a fixed 24 step loop, no search).
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from functools import lru_cache
+from math import comb
+from multiprocessing import Pool
+from typing import List, NamedTuple, Sequence
+
+# NumPy is only needed to build the table, lookups work without it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from card import COPIES_PER_CARD, NUM_CARD_TYPES
+from simulation import HAND_SIZE, NUM_CATEGORIES
+from solver import CATEGORY_SETS, WINNING_SETS, category_key
+
+MAGIC = b"HPOT"
+VERSION = 1
+# magic, version, hands, hand size, probability denominator
+HEADER = struct.Struct("<4sHIHQ")
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_odds.bin")
+
+DECK_SIZE = NUM_CARD_TYPES * COPIES_PER_CARD
+DENOMINATOR = comb(DECK_SIZE, HAND_SIZE)
+WIN_CARDS = 3 * WINNING_SETS        # Cards in a winning hand's sets
+
+
+def _suffix_ways() -> List[List[int]]:
+    # WAYS[i][s]: hands of s cards using only card ids i..23
+    ways = [[0] * (HAND_SIZE + 1) for _ in range(NUM_CARD_TYPES + 1)]
+    ways[NUM_CARD_TYPES][0] = 1
+    for i in range(NUM_CARD_TYPES - 1, -1, -1):
+        for s in range(HAND_SIZE + 1):
+            ways[i][s] = sum(ways[i + 1][s - v] for v in range(min(s, COPIES_PER_CARD) + 1))
+    return ways
+
+
+WAYS = _suffix_ways()
+NUM_HANDS = WAYS[0][HAND_SIZE]
+
+
+def hand_rank(counts: Sequence[int]) -> int:
+    # Position of an 8 card hand among all hands in ascending count vector order
+    rank = 0
+    left = HAND_SIZE
+    for i, count in enumerate(counts):
+        for v in range(count):
+            rank += WAYS[i + 1][left - v]
+        left -= count
+    if left:
+        raise ValueError(f"expected a {HAND_SIZE} card hand")
+    return rank
+
+
+def hand_unrank(rank: int) -> List[int]:
+    counts = []
+    left = HAND_SIZE
+    for i in range(NUM_CARD_TYPES):
+        v = 0
+        while rank >= WAYS[i + 1][left - v]:
+            rank -= WAYS[i + 1][left - v]
+            v += 1
+        counts.append(v)
+        left -= v
+    return counts
+
+
+@lru_cache(maxsize=None)
+def category_overlap(a: int, b: int, c: int, sets: int) -> int:
+    # Most held cards that can be part of `sets` sets taken from this category (-1 if they cannot be formed)
+    best = -1
+    for category_sets in range(sets + 1):
+        for t1 in range(sets - category_sets + 1):
+            for t2 in range(sets - category_sets - t1 + 1):
+                t3 = sets - category_sets - t1 - t2
+                need = (3 * t1 + category_sets, 3 * t2 + category_sets, 3 * t3 + category_sets)
+                if max(need) <= COPIES_PER_CARD:
+                    best = max(best, min(a, need[0]) + min(b, need[1]) + min(c, need[2]))
+    return best
+
+
+def cards_from_win(counts: Sequence[int]) -> int:
+    # Fewest new cards that complete WINNING_SETS sets with the cards held (a draw per card, no steals counted)
+    best = [0] + [-1] * WINNING_SETS
+    for base in range(0, NUM_CARD_TYPES, 3):
+        a, b, c = counts[base], counts[base + 1], counts[base + 2]
+        best = [max(best[k - j] + category_overlap(a, b, c, j) for j in range(k + 1)
+                    if best[k - j] >= 0 and category_overlap(a, b, c, j) >= 0) for k in range(WINNING_SETS + 1)]
+    return WIN_CARDS - best[WINNING_SETS]
+
+
+# Building (NumPy). Hands are generated a category at a time in rank order, with the per category values combined as they go.
+
+def _triple_tables():
+    triples = [(a, b, c) for a in range(COPIES_PER_CARD + 1) for b in range(COPIES_PER_CARD + 1)
+               for c in range(COPIES_PER_CARD + 1)]
+    size = np.array([sum(t) for t in triples], dtype=np.int16)
+    ways = np.array([comb(COPIES_PER_CARD, a) * comb(COPIES_PER_CARD, b) * comb(COPIES_PER_CARD, c)
+                     for a, b, c in triples], dtype=np.uint32)
+    sets = np.array([CATEGORY_SETS[category_key(*t)] for t in triples], dtype=np.uint8)
+    overlap = np.array([[category_overlap(*t, k) for k in range(WINNING_SETS + 1)] for t in triples], dtype=np.int16)
+    # Triples that fit in r remaining cards, ascending, padded with -1
+    fits = np.full((HAND_SIZE + 1, len(triples)), -1, dtype=np.int16)
+    for r in range(HAND_SIZE + 1):
+        ok = np.flatnonzero(size <= r)
+        fits[r, :len(ok)] = ok
+    return size, ways, sets, overlap, fits
+
+
+def _build_block(first: int):
+    # Every hand whose first category holds triple number `first`, in rank order
+    size, ways, sets, overlap, fits = _triple_tables()
+    used = size[[first]].copy()
+    numerator = ways[[first]].copy()
+    total_sets = sets[[first]].copy()
+    best = overlap[[first]].copy()
+
+    for category in range(1, NUM_CATEGORIES):
+        left = HAND_SIZE - used
+        choices = (fits[left] >= 0).sum(axis=1)
+        parent = np.repeat(np.arange(len(used)), choices)
+        offset = np.arange(len(parent)) - np.repeat(np.cumsum(choices) - choices, choices)
+        triple = fits[left[parent], offset].astype(np.int64)
+        if category == NUM_CATEGORIES - 1:
+            # The last category takes exactly the cards that are left
+            keep = size[triple] == left[parent]
+            parent, triple = parent[keep], triple[keep]
+
+        used = used[parent] + size[triple]
+        numerator = numerator[parent] * ways[triple]
+        total_sets = total_sets[parent] + sets[triple]
+        prev, add = best[parent], overlap[triple]
+        best = np.full((len(parent), WINNING_SETS + 1), -1, dtype=np.int16)
+        for k in range(WINNING_SETS + 1):
+            for j in range(k + 1):
+                ok = (prev[:, k - j] >= 0) & (add[:, j] >= 0)
+                best[:, k] = np.where(ok, np.maximum(best[:, k], prev[:, k - j] + add[:, j]), best[:, k])
+
+    return numerator, total_sets, (WIN_CARDS - best[:, WINNING_SETS]).astype(np.uint8)
+
+
+def build_table(path: str = DEFAULT_PATH, workers: int | None = None) -> int:
+    # Write the whole table to path and return the number of hands. Blocks (one per first category holding) are built
+    # in parallel and written in rank order.
+    if np is None:
+        raise RuntimeError("Building the opening table requires NumPy. Install it with 'pip install numpy'.")
+    size = _triple_tables()[0]
+    blocks = [t for t in range(len(size)) if size[t] <= HAND_SIZE]
+    workers = workers or os.cpu_count() or 1
+
+    numerators, sets, distances = [], [], []
+
+    def collect(parts) -> None:
+        for numerator, hand_sets, distance in parts:
+            numerators.append(numerator)
+            sets.append(hand_sets)
+            distances.append(distance)
+
+    if workers <= 1:
+        collect(map(_build_block, blocks))
+    else:
+        with Pool(processes=workers) as pool:
+            collect(pool.imap(_build_block, blocks))
+
+    numerator = np.concatenate(numerators)
+    if len(numerator) != NUM_HANDS or int(numerator.sum(dtype=np.uint64)) != DENOMINATOR:
+        raise RuntimeError("Opening table does not cover every hand exactly once.")
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, NUM_HANDS, HAND_SIZE, DENOMINATOR))
+        numerator.astype("<u4").tofile(f)
+        np.concatenate(sets).astype(np.uint8).tofile(f)
+        np.concatenate(distances).astype(np.uint8).tofile(f)
+    return NUM_HANDS
+
+
+class Opening(NamedTuple):
+    probability: float      # Chance of being dealt exactly this hand
+    ways: int               # Deals giving this hand, out of DENOMINATOR
+    sets: int               # Most disjoint sets in the hand
+    cards_from_win: int     # Fewest new cards that make it a winning hand
+
+
+class OpeningTable:
+    # Read-only view of a built table. Opening the file only maps it, pages are read as lookups touch them.
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.hands, hand_size, self.denominator = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION or hand_size != HAND_SIZE or self.hands != NUM_HANDS:
+            raise ValueError(f"{path} is not an opening table for this deck.")
+        start = HEADER.size
+        self._ways = memoryview(self._map)[start:start + 4 * self.hands].cast("I")
+        self._sets = memoryview(self._map)[start + 4 * self.hands:start + 5 * self.hands]
+        self._distance = memoryview(self._map)[start + 5 * self.hands:start + 6 * self.hands]
+
+
+    def lookup(self, counts: Sequence[int]) -> Opening:
+        rank = hand_rank(counts)
+        ways = self._ways[rank]
+        return Opening(ways / self.denominator, ways, self._sets[rank], self._distance[rank])
+
+
+    def close(self) -> None:
+        self._ways.release()
+        self._sets.release()
+        self._distance.release()
+        self._map.close()
@@ -0,0 +1,102 @@
+# Parallel Monte Carlo AI. Spreads rollouts for every candidate move over a persistent process pool and merges whatever
+# the workers return before the move deadline.
+
+from __future__ import annotations
+
+import atexit
+import os
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+from typing import List, Tuple
+
+from ai import MonteCarloStrategy, Observation, best_option, greedy_discard
+
+# Share of the move budget workers spend on rollouts, the rest covers sending results back
+WORKER_BUDGET_SHARE = 0.8
+
+# One pool per process, started on first use and reused for every later move
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+
+# Each worker keeps its own searcher between moves
+_worker_search: MonteCarloStrategy | None = None
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        shutdown_pool()
+        _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def _init_worker() -> None:
+    global _worker_search
+    # Seeded from the pid so workers explore different determinizations
+    _worker_search = MonteCarloStrategy(seed=os.getpid())
+
+
+def _ping(_: int) -> int:
+    return os.getpid()
+
+
+def _worker_evaluate(obs: Observation, options: list, drawing: bool, deadline: float,
+                     horizon_rounds: int) -> Tuple[List[float], List[int]]:
+    # deadline is a time.perf_counter() value. That clock is system wide, so a worker that picks up its task late
+    # still stops on time, and one that picks it up after the deadline runs no rollouts at all.
+    if time.perf_counter() >= deadline:
+        return [0.0] * len(options), [0] * len(options)
+    _worker_search.horizon_rounds = horizon_rounds
+    return _worker_search.evaluate(obs, options, drawing, deadline)
+
+
+class ParallelMonteCarloStrategy(MonteCarloStrategy):
+    # Every worker runs rollouts for all candidates with its own random stream (root parallel search),
+    # so the rollouts per move grow with the number of workers.
+
+    def __init__(self, time_budget: float = 0.02, horizon_rounds: int = 4, workers: int | None = None,
+                 seed: int | None = None) -> None:
+        super().__init__(time_budget=time_budget, horizon_rounds=horizon_rounds, seed=seed)
+        self.workers = workers or os.cpu_count() or 1
+        # Start the workers now so the first move does not pay for process startup
+        list(get_pool(self.workers).map(_ping, range(self.workers)))
+
+
+    def _search(self, obs: Observation, options: list, drawing: bool):
+        start = time.perf_counter()
+        deadline = start + self.time_budget
+        pool = get_pool(self.workers)
+        futures = [pool.submit(_worker_evaluate, obs, options, drawing,
+                               start + self.time_budget * WORKER_BUDGET_SHARE, self.horizon_rounds)
+                   for _ in range(self.workers)]
+
+        # Merge what has arrived by the deadline. Late tasks still waiting in the queue are cancelled, running ones
+        # stop at their own deadline, so neither holds up the next move.
+        done, late = wait(futures, timeout=max(deadline - time.perf_counter(), 0), return_when=FIRST_EXCEPTION)
+        for future in late:
+            future.cancel()
+        totals = [0.0] * len(options)
+        visits = [0] * len(options)
+        for future in done:
+            # A worker's exception is raised here, a failing search is a bug and not a slow move
+            worker_totals, worker_visits = future.result()
+            for i in range(len(options)):
+                totals[i] += worker_totals[i]
+                visits[i] += worker_visits[i]
+
+        self.last_rollouts = sum(visits)
+        if not self.last_rollouts:
+            # Nothing came back in time: fall back to the greedy rollout policy
+            return None if drawing else greedy_discard(obs.counts, obs.rules.ingredients)
+        return best_option(options, totals, visits)
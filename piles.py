@@ -0,0 +1,47 @@
+# Seats whose discard pile has cards, kept up to date as piles fill and empty so that finding the piles a player can
+# take from never scans every seat. Used by Game and SimulationGame, which matters on large tables (see rules.py).
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from typing import List
+
+
+class OpenPiles:
+    __slots__ = ("seats", "is_open")
+
+    def __init__(self, num_players: int) -> None:
+        self.seats: List[int] = []              # Seats with a non-empty pile, in seat order
+        self.is_open = [False] * num_players
+
+
+    def opened(self, seat: int) -> None:
+        # Call after a card goes onto seat's pile
+        if not self.is_open[seat]:
+            insort(self.seats, seat)
+            self.is_open[seat] = True
+
+
+    def emptied(self, seat: int) -> None:
+        # Call after the last card is taken from seat's pile
+        if self.is_open[seat]:
+            del self.seats[bisect_left(self.seats, seat)]
+            self.is_open[seat] = False
+
+
+    def reset(self, piles) -> None:
+        self.seats = [seat for seat, pile in enumerate(piles) if pile]
+        self.is_open = [bool(pile) for pile in piles]
+
+
+    def count_for(self, seat: int) -> int:
+        # Piles seat can take from (every open pile but its own)
+        return len(self.seats) - self.is_open[seat]
+
+
+    def nth_for(self, seat: int, index: int) -> int:
+        # The index-th pile seat can take from, in seat order
+        other = self.seats[index]
+        if self.is_open[seat] and other >= seat:
+            other = self.seats[index + 1]
+        return other
@@ -2,15 +2,25 @@
 
 from __future__ import annotations
 from typing import List
-from card import Card, CATEGORIES
-from card import CATEGORY_EMOJI, CATEGORY_COLORS
+from card import Card
+from card import CATEGORY_EMOJI, CATEGORY_COLORS, white
+from hand import HandCounts
+from profiler import profiler
+from rules import STANDARD, Rules
+from solver import best_partition
 
 
 class Player:
-    def __init__(self, name: str, is_human: bool = False) -> None:
+    def __init__(self, name: str, is_human: bool = False, rules: Rules = STANDARD) -> None:
         self.name = name
         self.is_human = is_human
+        self.rules = rules
+        # Card of every card id and card id of every card under the rules (card.cid in the standard game)
+        self._cards = rules.cards
+        self._ids = rules.card_ids
         self.hand: List[Card] = []
+        # Count array kept in step with self.hand, used for sorting, searching and set detection
+        self.counts = HandCounts(rules)
         self.discard_pile: List[Card] = []
         # Each set is (set_type, [Card, Card, Card])
         self.completed_sets: List[Tuple[str, List[Card]]] = []
@@ -22,11 +32,13 @@ class Player:
     def add_card(self, card: Card) -> None:
         if card is not None:
             self.hand.append(card)
+            self.counts.add(self._ids[card])
 
 
     def discard_card_by_index(self, index: int) -> Card:
         # Remove the card at the given index from hand and place it on the player's discard pile. Return the discarded card.
         card = self.hand.pop(index)
+        self.counts.remove(self._ids[card])
         self.discard_pile.append(card)
         return card
     
@@ -42,149 +54,45 @@ class Player:
         if not other.discard_pile:
             return None
         card = other.discard_pile.pop()
-        self.hand.append(card)
+        self.add_card(card)
         return card
     
     
 
-    # Sorting using insertion sort
+    def load_hand(self, counts) -> None:
+        # Replace the hand with the cards of a count array (used by Game.restore), already sorted
+        self.counts.clear()
+        for cid, count in enumerate(counts):
+            for _ in range(count):
+                self.counts.add(cid)
+        self.hand = [self._cards[cid] for cid in self.counts.ids_in_order()]
+        self.completed_sets = []
+        self.score = 0
 
-    def sort_hand(self) -> None:
-        for i in range(1, len(self.hand)):
-            key_card = self.hand[i]
-            j = i - 1
 
-            # Compare using card.id_tuple() for order
-            while j >= 0 and self.hand[j].id_tuple() > key_card.id_tuple():
-                self.hand[j + 1] = self.hand[j]
-                j -= 1
+    # Sorting from the count array
 
-            self.hand[j + 1] = key_card
+    def sort_hand(self) -> None:
+        # Card ids follow (category, ingredient) order, so walking the counts rebuilds the hand already sorted
+        with profiler.phase("sort_hand"):
+            self.hand = [self._cards[cid] for cid in self.counts.ids_in_order()]
 
 
-    # Searching using binary search
-    
+    # Searching
+
     def has_card_binary_search(self, target: Card) -> bool:
-        # Hand must be sorted by sort_hand() first.
-        low = 0
-        high = len(self.hand) - 1
-        target_key = target.id_tuple()
-
-        while low <= high:
-            mid = (low + high) // 2
-            mid_key = self.hand[mid].id_tuple()
-
-            if mid_key == target_key:
-                return True
-            elif mid_key < target_key:
-                low = mid + 1
-            else:
-                high = mid - 1
-        
-        return False
+        # Constant time lookup in the count array. The hand does not need to be sorted.
+        return self.counts.has(self._ids[target])
 
     # Detect sets and score
 
     def find_sets_in_hand(self):
-        # Detect 3 of a kind sets and do not remove any cards. Return a list of sets.
-        sets_found = []
-
-        # Group by card identity
-        by_exact = {}
-        for card in self.hand:
-            key = (card.category, card.ingredient)
-            by_exact.setdefault(key, []).append(card)
-
-        # Detect 3 of a kind
-        for key, cards in by_exact.items():
-            if len(cards) >= 3:
-                sets_found.append(("three_of_a_kind", cards[:3]))
-
-        # Group by category for cateogry sets
-        by_category = {}
-        for card in self.hand:
-            by_category.setdefault(card.category, {})
-            by_category[card.category].setdefault(card.ingredient, 0)
-            by_category[card.category][card.ingredient] += 1
-
-        # For each category, see if we have all 3 different ingredients
-        from card import CATEGORIES
-        for category, ingredients in CATEGORIES.items():
-            if category in by_category:
-                counts = [by_category[category].get(ing, 0) for ing in ingredients]
-                if min(counts) >= 1:
-                    # Can form exactly one category set (do NOT remove cards)
-                    # Build a 3-card list from the hand
-                    set_cards = []
-                    for ing in ingredients:
-                        for card in self.hand:
-                            if card.category == category and card.ingredient == ing:
-                                set_cards.append(card)
-                                break
-                    sets_found.append(("category_set", set_cards))
-
-        return sets_found
-
-
-    def _extract_three_of_a_kind_sets(self, cards: List[Card]) -> List[Card]:
-        groups = {}
-        for card in cards:
-            key = card.id_tuple()
-            groups.setdefault(key, []).append(card)
-
-        remaining: List[Card] = []  # MUST be initialized before loop
-
-        for key, card_list in groups.items():
-            count = len(card_list)
-            if count >= 3:
-                # Take exactly 3 cards for the set
-                set_cards = card_list[:3]
-                self.completed_sets.append(("three_of_a_kind", set_cards))
-                self.score += 120
-
-                # Extra copies (4th card) should remain in the hand
-                extra_cards = card_list[3:]
-                remaining.extend(extra_cards)
-            else:
-                # Less than 3, keep all in remaining pool
-                remaining.extend(card_list)
-
-        return remaining
-    
-
-    def _extract_category_sets(self, cards: List[Card]) -> List[Card]:
-        # Group by category then by ingredient
-        by_category: dict[str, dict[str, List[Card]]] = {}
+        # Detect the best partition of the hand into disjoint 3 of a kind and category sets (each card is used at most once, see solver.py).
+        # Do not remove any cards. Return a list of sets.
+        cards = self._cards
+        partition = best_partition(self.counts.counts, self.rules.ingredients)
+        return [(set_type, [cards[cid] for cid in cids]) for set_type, cids in partition]
 
-        for card in cards: 
-            by_category.setdefault(card.category, {})
-            by_category[card.category].setdefault(card.ingredient, [])
-            by_category[card.category][card.ingredient].append(card)
-
-        remaining: List[Card] = []
-
-        for category, ingredient_dict in by_category.items():
-        # Ingredient names from our global definition
-            all_ingredients = CATEGORIES[category]
-
-         # Find how many complete sets can be formed limited by the minimum count across each ingredient
-            counts = [len(ingredient_dict.get(ing, [])) for ing in all_ingredients]
-            possible_sets = min(counts)
-
-            # Form those sets
-            for _ in range(possible_sets):
-                set_cards: List[Card] = []
-                for ing in all_ingredients:
-                    set_cards.append(ingredient_dict[ing].pop())
-                self.completed_sets.append(("category_set", set_cards))
-                self.score += 60
-
-            # Leftover cards stay in the remaining pool
-            for ing in all_ingredients:
-                remaining.extend(ingredient_dict.get(ing, []))
-
-        return remaining    
-    
 
     # Helpers
     
@@ -194,6 +102,16 @@ class Player:
 
     def sets_count(self) -> int:
         return len(self.completed_sets)
+
+
+    def sets_in_hand_count(self) -> int:
+        # Most disjoint sets the hand can form, the same number as len(find_sets_in_hand()), read from the live index without rescanning the hand
+        return self.counts.sets_count()
+
+
+    def best_score_in_hand(self) -> int:
+        # Best score among the partitions with the most sets
+        return self.counts.best_score()
     
 
     def describe_hand(self):
@@ -204,9 +122,11 @@ class Player:
         output_lines = []
         index = 0
 
-        for category in sorted(grouped.keys()):
+        # Categories in card id order (alphabetical in the standard game)
+        ingredients = self.rules.ingredients
+        for category in sorted(grouped, key=lambda name: self._ids[grouped[name][0]] // ingredients):
             emoji = CATEGORY_EMOJI.get(category, "")
-            color = CATEGORY_COLORS.get(category)
+            color = CATEGORY_COLORS.get(category, white)
             header = color(f"{emoji} {category}")
             output_lines.append(f"{header}:")
 
@@ -0,0 +1,255 @@
+# Tabular computer player learned by self-play. A decision looks at one card at a time through a small feature: how many
+# of each ingredient of that card's category the hand holds, and which ingredient the card is. The policy is two tables
+# over those features (value of discarding a card, value of taking a discard pile's top card) plus the value of drawing
+# from the deck, saved as one flat float32 file and memory-mapped by every game that uses it.
+#
+# Training plays games on the headless engine with the current tables (plus some random moves), credits every decision
+# with its seat's final result and moves each table entry towards the average result of the decisions that used it.
+
+from __future__ import annotations
+
+import mmap
+import os
+import random
+import struct
+from array import array
+from functools import lru_cache
+from multiprocessing import Pool
+from typing import List, Sequence, Tuple
+
+# NumPy is only needed for training, playing from a saved table works without it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ai import ComputerStrategy, Observation, RandomStrategy
+from rules import Rules
+from simulation import SimulationGame
+from solver import KEY_STEP, category_key
+
+MAGIC = b"HPTP"
+VERSION = 1
+HEADER = struct.Struct("<4sHI")        # magic, version, number of float32 values
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "policy.bin")
+
+NUM_FEATURES = 125 * 3                  # Category holding (category_key) x ingredient position
+DISCARD_BASE = 0
+STEAL_BASE = NUM_FEATURES
+DRAW_INDEX = 2 * NUM_FEATURES
+TABLE_SIZE = DRAW_INDEX + 1
+
+
+def card_feature(counts: Sequence[int], cid: int) -> int:
+    base = cid - cid % 3
+    return category_key(counts[base], counts[base + 1], counts[base + 2]) * 3 + cid % 3
+
+
+class TabularStrategy(ComputerStrategy):
+    # Every choice is a table lookup per candidate card. epsilon > 0 makes some moves random (used in training).
+
+    def __init__(self, table: Sequence[float], epsilon: float = 0.0) -> None:
+        self.table = table
+        self.epsilon = epsilon
+        self._fallback = RandomStrategy()
+
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_PATH) -> "TabularStrategy":
+        return cls(load_table(path))
+
+
+    def supports(self, rules: Rules) -> bool:
+        # Features are standard category keys
+        return rules.standard_cards
+
+
+    def choose_draw(self, obs: Observation, rng) -> int | None:
+        if self.epsilon and rng.random() < self.epsilon:
+            return self._fallback.choose_draw(obs, rng)
+        table = self.table
+        choice, best = None, table[DRAW_INDEX]
+        for seat in obs.steal_options():
+            cid = obs.discard_piles[seat][-1]
+            value = table[STEAL_BASE + card_feature(obs.counts, cid)]
+            if value > best and self._keeps(obs.counts, cid):
+                choice, best = seat, value
+        return choice
+
+
+    def choose_discard(self, obs: Observation, rng) -> int:
+        if self.epsilon and rng.random() < self.epsilon:
+            return self._fallback.choose_discard(obs, rng)
+        return self._best_discard(obs.counts)
+
+
+    def _keeps(self, counts: Sequence[int], cid: int) -> bool:
+        # Whether the hand would keep cid after taking it. Taking a card only to discard it straight back gains
+        # nothing, and with every seat on the same table it can pass one card round the table forever.
+        held = list(counts)
+        held[cid] += 1
+        return self._best_discard(held) != cid
+
+
+    def _best_discard(self, counts: Sequence[int]) -> int:
+        table = self.table
+        best_cid, best = -1, float("-inf")
+        for cid in range(len(counts)):
+            if counts[cid]:
+                value = table[DISCARD_BASE + card_feature(counts, cid)]
+                if value > best:
+                    best_cid, best = cid, value
+        return best_cid
+
+
+    # Batched decisions (see batch_engine): the same lookups for every row at once
+
+    def _table_array(self) -> "np.ndarray":
+        if np is None:
+            raise RuntimeError("Batched decisions require NumPy. Install it with 'pip install numpy'.")
+        return np.asarray(self.table, dtype=np.float32)
+
+
+    def choose_draw_batch(self, batch, rng) -> Sequence[int]:
+        if self.epsilon:
+            return super().choose_draw_batch(batch, rng)
+        table = self._table_array()
+        rows = np.arange(len(batch))
+        tops = batch.tops.astype(np.int64)
+        open_pile = tops >= 0
+        top = np.where(open_pile, tops, 0)
+        # Piles whose top card the hand would discard straight back are not worth taking (see _keeps)
+        for seat in range(tops.shape[1]):
+            taken = batch.counts.copy()
+            taken[rows, top[:, seat]] += 1
+            open_pile[:, seat] &= self._best_discards(table, taken) != top[:, seat]
+        values = np.where(open_pile, table[STEAL_BASE + _card_features(batch.counts)[rows[:, None], top]], -np.inf)
+        best = values.argmax(axis=1)
+        return np.where(values[rows, best] > table[DRAW_INDEX], best, -1)
+
+
+    def choose_discard_batch(self, batch, rng) -> Sequence[int]:
+        if self.epsilon:
+            return super().choose_discard_batch(batch, rng)
+        return self._best_discards(self._table_array(), batch.counts)
+
+
+    @staticmethod
+    def _best_discards(table: "np.ndarray", counts: "np.ndarray") -> "np.ndarray":
+        values = table[DISCARD_BASE + _card_features(counts)]
+        return np.where(counts > 0, values, -np.inf).argmax(axis=1)
+
+
+def _card_features(counts: "np.ndarray") -> "np.ndarray":
+    # card_feature() of every card id for every row of a (rows, 24) count array
+    counts = counts.astype(np.int64)
+    keys = counts[:, 0::3] * KEY_STEP[0] + counts[:, 1::3] * KEY_STEP[1] + counts[:, 2::3] * KEY_STEP[2]
+    return np.repeat(keys, 3, axis=1) * 3 + np.tile(np.arange(3), keys.shape[1])
+
+
+class _RecordingStrategy(TabularStrategy):
+    # Training player: remembers the feature of every decision it makes
+
+    def __init__(self, table: Sequence[float], epsilon: float) -> None:
+        super().__init__(table, epsilon)
+        self.features: List[int] = []
+
+
+    def choose_draw(self, obs: Observation, rng) -> int | None:
+        seat = super().choose_draw(obs, rng)
+        if seat is None:
+            self.features.append(DRAW_INDEX)
+        else:
+            self.features.append(STEAL_BASE + card_feature(obs.counts, obs.discard_piles[seat][-1]))
+        return seat
+
+
+    def choose_discard(self, obs: Observation, rng) -> int:
+        cid = super().choose_discard(obs, rng)
+        self.features.append(DISCARD_BASE + card_feature(obs.counts, cid))
+        return cid
+
+
+# Saving and loading
+
+def save_table(table: Sequence[float], path: str = DEFAULT_PATH) -> None:
+    values = array("f", table)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(values)))
+        values.tofile(f)
+
+
+@lru_cache(maxsize=None)
+def load_table(path: str = DEFAULT_PATH) -> memoryview:
+    # The table as a read-only float32 view of the mapped file. Cached, so every game in a process shares one mapping.
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, size = HEADER.unpack_from(mapped)
+    if magic != MAGIC or version != VERSION or size != TABLE_SIZE:
+        raise ValueError(f"{path} is not a policy table for this game.")
+    return memoryview(mapped)[HEADER.size:HEADER.size + 4 * size].cast("f")
+
+
+# Training
+
+def final_reward(result, seat: int) -> float:
+    # 1 for the winner, otherwise a little for every set in the final hand
+    return 1.0 if result.winner == seat else 0.25 * result.sets[seat]
+
+
+def _self_play(task: Tuple[Sequence[float], int, int, int, float]):
+    # Play a batch of games with the given table. Returns per feature totals of results and visit counts, and the
+    # number of games that were won.
+    table, games, num_players, seed, epsilon = task
+    rng = random.Random(seed)
+    totals = np.zeros(TABLE_SIZE)
+    visits = np.zeros(TABLE_SIZE)
+    wins = 0
+    for _ in range(games):
+        players = [_RecordingStrategy(table, epsilon) for _ in range(num_players)]
+        result = SimulationGame(num_players, rng=rng, strategies=players).run()
+        wins += result.winner is not None
+        for seat, player in enumerate(players):
+            features = np.array(player.features, dtype=np.int64)
+            totals += np.bincount(features, minlength=TABLE_SIZE) * final_reward(result, seat)
+            visits += np.bincount(features, minlength=TABLE_SIZE)
+    return totals, visits, wins
+
+
+def train(iterations: int = 20, games_per_iteration: int = 2000, workers: int | None = None, num_players: int = 4,
+          seed: int = 0, epsilon: float = 0.1, learning_rate: float = 0.5, path: str | None = DEFAULT_PATH,
+          report=print) -> "np.ndarray":
+    # Self-play policy iteration. Each iteration's games are split over the workers, their totals are added up and
+    # every visited entry moves learning_rate of the way towards its average result.
+    if np is None:
+        raise RuntimeError("Training requires NumPy. Install it with 'pip install numpy'.")
+    workers = workers or os.cpu_count() or 1
+    table = np.zeros(TABLE_SIZE)
+    pool = Pool(processes=workers) if workers > 1 else None
+    try:
+        for iteration in range(iterations):
+            share = -(-games_per_iteration // workers)
+            tasks = [(array("f", table), share, num_players, seed * 1_000_003 + iteration * workers + w, epsilon)
+                     for w in range(workers)]
+            parts = pool.map(_self_play, tasks) if pool is not None else map(_self_play, tasks)
+            totals = np.zeros(TABLE_SIZE)
+            visits = np.zeros(TABLE_SIZE)
+            wins = 0
+            for part_totals, part_visits, part_wins in parts:
+                totals += part_totals
+                visits += part_visits
+                wins += part_wins
+
+            seen = visits > 0
+            table[seen] += learning_rate * (totals[seen] / visits[seen] - table[seen])
+            if report is not None:
+                report(f"Iteration {iteration + 1}/{iterations}: {wins / (share * workers):.1%} of games won, "
+                       f"{int(seen.sum())} table entries visited")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    if path is not None:
+        save_table(table, path)
+    return table
@@ -0,0 +1,136 @@
+# Built-in profiling for the interactive game. Per phase timers (deal, draw, set check, discard, render, AI think ...),
+# event counters (steals, deck draws, set rescans ...) and a latency histogram per phase, exported as JSON at the end of
+# a run. Turned on with main.py --profile.
+#
+# The game calls the shared profiler below unconditionally. While it is disabled phase() hands back one shared no-op
+# context manager and count() returns at once, so instrumented code costs a method call and nothing else.
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Dict
+
+from stats import Histogram
+
+_BUCKETS = 40       # Latency buckets are powers of two in microseconds, 1 us up to about 6 days
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+class _Timing:
+    # One timed block of a phase. Every block keeps its own start time, so blocks of the same phase can nest or run on
+    # different threads at once (the animator's phases run on the animator thread).
+    __slots__ = ("timer", "start")
+
+    def __init__(self, timer: "PhaseTimer") -> None:
+        self.timer = timer
+        self.start = 0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc) -> bool:
+        self.timer.add(time.perf_counter_ns() - self.start)
+        return False
+
+
+class PhaseTimer:
+    # Calls, total and worst time of one phase, and how its calls' latencies spread over power of two buckets
+    __slots__ = ("name", "calls", "total_ns", "max_ns", "histogram")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        # Bucket k holds latencies of 2^(k-1) up to 2^k microseconds (bucket 0 is under 1 us)
+        self.histogram = Histogram(0, _BUCKETS)
+
+
+    def add(self, elapsed_ns: int) -> None:
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.histogram.add((elapsed_ns // 1000).bit_length())
+
+
+    def to_dict(self) -> dict:
+        buckets = self.histogram.buckets[1:]
+        return {
+            "calls": self.calls,
+            "total_ms": self.total_ns / 1e6,
+            "mean_us": self.total_ns / self.calls / 1e3 if self.calls else 0.0,
+            "max_us": self.max_ns / 1e3,
+            # Upper bound of each bucket in microseconds -> calls, empty buckets left out
+            "histogram_us": {str(1 << k): count for k, count in enumerate(buckets) if count},
+        }
+
+
+class Profiler:
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.phases: Dict[str, PhaseTimer] = {}
+        self.counters: Dict[str, int] = {}
+        self._started = 0
+
+
+    def enable(self) -> None:
+        self.enabled = True
+        self._started = time.perf_counter_ns()
+
+
+    def disable(self) -> None:
+        self.enabled = False
+
+
+    def reset(self) -> None:
+        self.phases = {}
+        self.counters = {}
+        self._started = time.perf_counter_ns()
+
+
+    def phase(self, name: str):
+        # with profiler.phase("draw"): ... times the block when profiling is on
+        if not self.enabled:
+            return _NO_PHASE
+        timer = self.phases.get(name)
+        if timer is None:
+            timer = self.phases[name] = PhaseTimer(name)
+        return _Timing(timer)
+
+
+    def count(self, name: str, amount: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+
+    def to_dict(self) -> dict:
+        return {
+            "wall_ms": (time.perf_counter_ns() - self._started) / 1e6 if self._started else 0.0,
+            "phases": {name: timer.to_dict() for name, timer in sorted(self.phases.items())},
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+
+    def export(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+
+
+# Shared by the whole game
+profiler = Profiler()
@@ -0,0 +1,108 @@
+# Random number sources for the deck, the game and the simulators. Anything with random.Random's methods can drive a
+# game, a NumPy Generator is wrapped so it can be used the same way. Also holds the uniform shuffles: a single deck
+# Fisher-Yates driven by one block of random bits, and a batched shuffle that makes many deck orders at once.
+
+from __future__ import annotations
+
+import random
+from array import array
+
+# NumPy is optional, only the Generator wrapper and the batched shuffle need it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+WORD_BITS = 32
+WORD_MASK = (1 << WORD_BITS) - 1
+
+
+class NumpyRandom:
+    # random.Random style wrapper around a numpy.random.Generator, covering the methods the game and the strategies use
+
+    def __init__(self, generator) -> None:
+        self.generator = generator
+
+
+    def seed(self, seed: int | None = None) -> None:
+        self.generator = np.random.default_rng(seed)
+
+
+    def random(self) -> float:
+        return float(self.generator.random())
+
+
+    def getrandbits(self, k: int) -> int:
+        value = int.from_bytes(self.generator.bytes((k + 7) // 8), "little")
+        return value >> (-k % 8)
+
+
+    def randrange(self, start: int, stop: int | None = None) -> int:
+        if stop is None:
+            start, stop = 0, start
+        if stop <= start:
+            raise ValueError("empty range for randrange()")
+        return int(self.generator.integers(start, stop))
+
+
+    def randint(self, a: int, b: int) -> int:
+        return self.randrange(a, b + 1)
+
+
+    def choice(self, seq):
+        if not seq:
+            raise IndexError("Cannot choose from an empty sequence")
+        return seq[self.randrange(len(seq))]
+
+
+    def shuffle(self, items: list) -> None:
+        fisher_yates(items, self)
+
+
+def make_rng(rng=None, seed: int | None = None):
+    # rng may be None (the global random module, or a random.Random(seed) when a seed is given), a random.Random,
+    # a numpy Generator, or any object with random.Random's methods
+    if rng is None:
+        return random if seed is None else random.Random(seed)
+    if np is not None and isinstance(rng, np.random.Generator):
+        return NumpyRandom(rng)
+    return rng
+
+
+def fisher_yates(items: list, rng) -> None:
+    # Uniform in-place shuffle. All swap positions come from one getrandbits() call cut into 32 bit words,
+    # each mapped onto 0..i by multiply-shift. A word that lands in the small biased zone is redrawn, so every
+    # position stays exactly equally likely.
+    n = len(items)
+    if n < 2:
+        return
+    words = array("I")
+    words.frombytes(rng.getrandbits(WORD_BITS * (n - 1)).to_bytes(4 * (n - 1), "little"))
+
+    for i, word in zip(range(n - 1, 0, -1), words):
+        bound = i + 1
+        product = word * bound
+        if (product & WORD_MASK) < bound:
+            threshold = (1 << WORD_BITS) % bound
+            while (product & WORD_MASK) < threshold:
+                product = rng.getrandbits(WORD_BITS) * bound
+        j = product >> WORD_BITS
+        items[i], items[j] = items[j], items[i]
+
+
+def shuffle_batch(count: int, size: int, generator) -> "np.ndarray":
+    # count independent uniform permutations of range(size), one per row. Each row sorts its own block of random keys,
+    # rows with a repeated key (which would favour one order) are redrawn.
+    if np is None:
+        raise RuntimeError("shuffle_batch requires NumPy. Install it with 'pip install numpy'.")
+    keys = generator.random((count, size))
+    order = keys.argsort(axis=1)
+
+    rows = np.arange(count)
+    while len(rows):
+        ranked = np.take_along_axis(keys[rows], order[rows], axis=1)
+        rows = rows[(ranked[:, 1:] == ranked[:, :-1]).any(axis=1)]
+        if len(rows):
+            keys[rows] = generator.random((len(rows), size))
+            order[rows] = keys[rows].argsort(axis=1)
+    return order
@@ -0,0 +1,105 @@
+# Define the frame-diffed table renderer. The table is pinned to the top of the terminal and the game log scrolls
+# underneath it. Each frame is compared line by line with the last one and only the changed lines are rewritten with
+# ANSI cursor moves, instead of reprinting the whole table every turn.
+
+import os
+import re
+import shutil
+import sys
+from typing import List
+
+from animation import animator
+
+# ANSI control sequences
+SAVE_CURSOR = "\0337"
+RESTORE_CURSOR = "\0338"
+CLEAR_SCREEN = "\033[2J"
+CLEAR_LINE = "\033[K"
+RESET_SCROLL_REGION = "\033[r"
+STYLE = re.compile(r"\033\[[0-9;]*m")
+
+
+def move_to(row: int, column: int = 1) -> str:
+    return f"\033[{row};{column}H"
+
+
+def update_row(row: int, old: str, new: str) -> str:
+    # Rewrite a changed row. When the unchanged start of the row is plain ASCII its screen width is known,
+    # so only the changed tail is written, after the styles that were active at that point.
+    full = move_to(row) + new + CLEAR_LINE
+    keep = len(os.path.commonprefix([old, new]))
+    start = new.rfind("\033", 0, keep)
+    if start >= 0:
+        style = STYLE.match(new, start)
+        if style is None or style.end() > keep:
+            keep = start                # Do not cut through a control sequence
+    prefix = new[:keep]
+    visible = STYLE.sub("", prefix)
+    if not visible.isascii():
+        return full
+    tail = move_to(row, len(visible) + 1) + "".join(STYLE.findall(prefix)) + new[keep:] + CLEAR_LINE
+    return tail if len(tail) < len(full) else full
+
+
+def scroll_region(top: int, bottom: int) -> str:
+    return f"\033[{top};{bottom}r"
+
+
+class TableRenderer:
+    # Falls back to printing every frame in full when output is not a terminal (pipes, files, tests) or the table does
+    # not fit on the screen
+
+    def __init__(self, enabled: bool | None = None) -> None:
+        self.enabled = sys.stdout.isatty() if enabled is None else enabled
+        self._frame: List[str] = []     # Lines currently on screen
+        self._height = 0                # Rows reserved for the table
+        self.bytes_written = 0
+
+
+    def render(self, lines: List[str]) -> None:
+        # lines may hold embedded newlines (describe_hand), the view model is one entry per screen row
+        rows = "\n".join(lines).split("\n")
+
+        # A table too tall to pin above at least one log row is reprinted in full, with no scroll region: terminals
+        # ignore a region that ends below the screen, and the pinned rows would scroll away under later diff writes
+        if not self.enabled or len(rows) + 2 >= shutil.get_terminal_size().lines:
+            if self._height:
+                self.close()
+            self._write("\n".join(rows) + "\n")
+            return
+
+        if len(rows) > self._height:
+            self._redraw(rows)
+            return
+
+        rows += [""] * (self._height - len(rows))
+        changed = [update_row(i + 1, self._frame[i], row)
+                   for i, row in enumerate(rows) if row != self._frame[i]]
+        if changed:
+            self._write(SAVE_CURSOR + "".join(changed) + RESTORE_CURSOR)
+        self._frame = rows
+
+
+    def close(self) -> None:
+        # Give the whole screen back to normal scrolling output
+        if self.enabled and self._height:
+            self._write(RESET_SCROLL_REGION + move_to(shutil.get_terminal_size().lines))
+        self._frame = []
+        self._height = 0
+
+
+    def _redraw(self, rows: List[str]) -> None:
+        # Full draw when the table grows: clear, draw every row, then keep the log scrolling below the table
+        self._height = len(rows)
+        self._frame = list(rows)
+        screen_rows = shutil.get_terminal_size().lines
+        out = [RESET_SCROLL_REGION, CLEAR_SCREEN]
+        out += [move_to(i + 1) + row + CLEAR_LINE for i, row in enumerate(rows)]
+        out.append(scroll_region(self._height + 2, screen_rows))
+        out.append(move_to(self._height + 2))
+        self._write("".join(out))
+
+
+    def _write(self, text: str) -> None:
+        self.bytes_written += len(text.encode("utf-8"))
+        animator.write(text)
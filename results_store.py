@@ -0,0 +1,247 @@
+# Columnar results store for large simulation runs. Every column is a flat binary file in one directory, game outcomes
+# are appended a chunk at a time and read back through memory maps, so queries run over millions of games with only one
+# block of rows in memory at a time.
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+# NumPy is only needed for the results store, the game itself has no external dependencies
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+META_FILE = "meta.json"
+CHUNK_ROWS = 1 << 16        # Games buffered before a chunk is appended to the column files
+QUERY_ROWS = 1 << 20        # Games read per block by the queries
+
+# Column name -> (dtype, one value per seat). winner is -1 for a draw, humans is a bitmask of human seats.
+COLUMNS = {
+    "winner": ("<i1", False),
+    "turns": ("<u2", False),
+    "deck_remaining": ("<u2", False),
+    "humans": ("<u8", False),
+    "sets": ("<u1", True),
+    "category_sets": ("<u1", True),
+    "scores": ("<u2", True),
+    "draws": ("<u2", True),
+    "steals": ("<u2", True),
+}
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("The results store requires NumPy. Install it with 'pip install numpy'.")
+
+
+def columns_from_results(results: Sequence, num_players: int, humans: int = 0) -> Dict[str, "np.ndarray"]:
+    # SimulationResults (or Game.result()) as one array per column, ready for ResultsWriter.append_columns
+    _require_numpy()
+    columns = {
+        "winner": np.array([-1 if r.winner is None else r.winner for r in results], dtype=COLUMNS["winner"][0]),
+        "turns": np.array([r.turns for r in results], dtype=COLUMNS["turns"][0]),
+        "deck_remaining": np.array([r.deck_remaining for r in results], dtype=COLUMNS["deck_remaining"][0]),
+        "humans": np.full(len(results), humans, dtype=COLUMNS["humans"][0]),
+    }
+    for name, (dtype, per_seat) in COLUMNS.items():
+        if per_seat:
+            columns[name] = np.array([getattr(r, name) for r in results], dtype=dtype).reshape(len(results), num_players)
+    return columns
+
+
+class ResultsWriter:
+    # Appends games to a store directory, creating it on first use. Results are buffered and written a chunk at a time.
+
+    def __init__(self, path: str, num_players: int, chunk_rows: int = CHUNK_ROWS) -> None:
+        _require_numpy()
+        self.path = path
+        self.num_players = num_players
+        self.chunk_rows = chunk_rows
+        self._pending: List = []
+        self._pending_humans: List[int] = []
+
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta["num_players"] != num_players:
+                raise ValueError(f"{path} holds {meta['num_players']} player games, not {num_players}.")
+        else:
+            with open(meta_path, "w") as f:
+                json.dump({"num_players": num_players,
+                           "columns": {name: dtype for name, (dtype, _) in COLUMNS.items()}}, f)
+
+
+    def append(self, result, humans: int = 0) -> None:
+        self._pending.append(result)
+        self._pending_humans.append(humans)
+        if len(self._pending) >= self.chunk_rows:
+            self.flush()
+
+
+    def append_columns(self, columns: Dict[str, "np.ndarray"]) -> None:
+        # A whole block of games at once (see columns_from_results)
+        self.flush()
+        self._write(columns)
+
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        columns = columns_from_results(self._pending, self.num_players)
+        columns["humans"] = np.array(self._pending_humans, dtype=COLUMNS["humans"][0])
+        self._pending.clear()
+        self._pending_humans.clear()
+        self._write(columns)
+
+
+    def close(self) -> None:
+        self.flush()
+
+
+    def _write(self, columns: Dict[str, "np.ndarray"]) -> None:
+        rows = {len(values) for values in columns.values()}
+        if len(rows) != 1 or set(columns) != set(COLUMNS):
+            raise ValueError("append_columns needs every column with the same number of games.")
+        for name, (dtype, _) in COLUMNS.items():
+            with open(os.path.join(self.path, name + ".bin"), "ab") as f:
+                np.ascontiguousarray(columns[name], dtype=dtype).tofile(f)
+
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ResultsStore:
+    # Read-only, memory-mapped view of a store directory. Queries walk the games in blocks of QUERY_ROWS.
+
+    def __init__(self, path: str) -> None:
+        _require_numpy()
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.num_players = json.load(f)["num_players"]
+
+        # Only games present in every column count, so a run that stopped mid-append is still readable
+        self.games = min(self._rows_on_disk(name) for name in COLUMNS)
+        self._columns = {name: self._map(name) for name in COLUMNS}
+
+
+    def _width(self, name: str) -> int:
+        return self.num_players if COLUMNS[name][1] else 1
+
+
+    def _rows_on_disk(self, name: str) -> int:
+        file = os.path.join(self.path, name + ".bin")
+        if not os.path.exists(file):
+            return 0
+        return os.path.getsize(file) // (np.dtype(COLUMNS[name][0]).itemsize * self._width(name))
+
+
+    def _map(self, name: str) -> "np.ndarray":
+        dtype, per_seat = COLUMNS[name]
+        shape = (self.games, self.num_players) if per_seat else (self.games,)
+        if self.games == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(os.path.join(self.path, name + ".bin"), dtype=dtype, mode="r", shape=shape)
+
+
+    def __len__(self) -> int:
+        return self.games
+
+
+    def column(self, name: str) -> "np.ndarray":
+        # The memory-mapped column, (games,) or (games, players) for per seat columns
+        return self._columns[name]
+
+
+    def blocks(self, names: Iterable[str], rows: int = QUERY_ROWS) -> Iterator[Dict[str, "np.ndarray"]]:
+        names = list(names)
+        for start in range(0, self.games, rows):
+            yield {name: np.asarray(self._columns[name][start:start + rows]) for name in names}
+
+
+    # Queries
+
+    def draw_rate(self) -> float:
+        draws = sum(int((block["winner"] < 0).sum()) for block in self.blocks(["winner"]))
+        return draws / self.games if self.games else 0.0
+
+
+    def mean(self, name: str) -> "np.ndarray | float":
+        # Average of a column, per seat for per seat columns
+        total = sum(block[name].sum(axis=0, dtype=np.int64) for block in self.blocks([name]))
+        return total / self.games if self.games else total
+
+
+    def win_rate_by_seat(self) -> "np.ndarray":
+        wins = np.zeros(self.num_players, dtype=np.int64)
+        for block in self.blocks(["winner"]):
+            winner = block["winner"]
+            wins += np.bincount(winner[winner >= 0], minlength=self.num_players)
+        return wins / max(self.games, 1)
+
+
+    def win_rate_by_role(self) -> Dict[str, float]:
+        # Share of seats of each kind that won their game, human seats taken from the humans bitmask
+        seats = np.arange(self.num_players, dtype=np.uint64)
+        played = {"human": 0, "ai": 0}
+        won = {"human": 0, "ai": 0}
+        for block in self.blocks(["winner", "humans"]):
+            human = ((block["humans"][:, None] >> seats) & np.uint64(1)).astype(bool)
+            winner = block["winner"]
+            decided = winner >= 0
+            winner_human = human[np.flatnonzero(decided), winner[decided]]
+            played["human"] += int(human.sum())
+            played["ai"] += int(human.size - human.sum())
+            won["human"] += int(winner_human.sum())
+            won["ai"] += int(len(winner_human) - winner_human.sum())
+        return {role: won[role] / played[role] if played[role] else 0.0 for role in played}
+
+
+    def win_rate_by_steal_rate(self, bins: int = 10) -> List[tuple]:
+        # Seats grouped by the share of their turns spent stealing: (low, high, seats, win rate) per bucket
+        edges = np.linspace(0.0, 1.0, bins + 1)
+        seats_in = np.zeros(bins, dtype=np.int64)
+        wins_in = np.zeros(bins, dtype=np.int64)
+        for block in self.blocks(["winner", "draws", "steals"]):
+            steals = block["steals"].astype(np.float64)
+            turns = steals + block["draws"]
+            rate = np.divide(steals, turns, out=np.zeros_like(steals), where=turns > 0)
+            bucket = np.minimum((rate * bins).astype(np.int64), bins - 1)
+            won = block["winner"][:, None] == np.arange(self.num_players)
+            seats_in += np.bincount(bucket.ravel(), minlength=bins)
+            wins_in += np.bincount(bucket.ravel(), weights=won.ravel(), minlength=bins).astype(np.int64)
+        return [(edges[i], edges[i + 1], int(seats_in[i]), wins_in[i] / seats_in[i] if seats_in[i] else 0.0)
+                for i in range(bins)]
+
+
+    def set_type_totals(self) -> Dict[str, int]:
+        # Sets in final hands by type, over every seat of every game
+        totals = {"category_set": 0, "three_of_a_kind": 0}
+        for block in self.blocks(["sets", "category_sets"]):
+            category = int(block["category_sets"].sum(dtype=np.int64))
+            totals["category_set"] += category
+            totals["three_of_a_kind"] += int(block["sets"].sum(dtype=np.int64)) - category
+        return totals
+
+
+    def summary(self) -> str:
+        lines = [f"Games stored: {self.games}", f"Draws: {self.draw_rate():.2%}"]
+        for seat, rate in enumerate(self.win_rate_by_seat()):
+            lines.append(f"Seat {seat + 1} win rate: {rate:.2%}")
+        for role, rate in self.win_rate_by_role().items():
+            lines.append(f"{role.upper() if role == 'ai' else role.capitalize()} seat win rate: {rate:.2%}")
+        for low, high, seats, rate in self.win_rate_by_steal_rate():
+            if seats:
+                lines.append(f"Steal rate {low:.0%}-{high:.0%}: {seats} seats, win rate {rate:.2%}")
+        sets = self.set_type_totals()
+        lines.append(f"Final hand sets: {sets['category_set']} category sets, {sets['three_of_a_kind']} three of a kinds")
+        return "\n".join(lines)
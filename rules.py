@@ -0,0 +1,123 @@
+# Table rules: seats, deck make-up, hand size and the win threshold. Deck, Player (set detection), Game and
+# SimulationGame all read their numbers from one Rules object, STANDARD being the original 4 seat, 96 card game.
+#
+# Cards are numbered per rules: category by category, ingredient by ingredient, so category i holds ids
+# i * ingredients ... (i + 1) * ingredients - 1. The standard shape uses the standard card ids (card.CARD_IDS).
+# Categories and ingredients beyond the standard 8 x 3 are made up as extra card types ("Pot 9", "Noodles #4").
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, List, Tuple
+
+from card import CARDS_BY_ID, CATEGORIES, COPIES_PER_CARD, Card
+from solver import WINNING_SETS, CategoryTable, category_table
+
+MIN_PLAYERS = 2
+MAX_PLAYERS = 64
+# Snapshots (state.py) and event logs (eventlog.py) store card ids, hand sizes and set counts in two bytes and card
+# counts in one. The largest two byte value is kept free to mark "no card".
+MAX_CARD_TYPES = 0xFFFF
+MAX_COPIES = 0xFF
+MAX_FIELD = 0xFFFF
+_STANDARD_CATEGORIES = sorted(CATEGORIES)
+_STANDARD_INGREDIENTS = {category: sorted(ingredients) for category, ingredients in CATEGORIES.items()}
+
+
+@dataclass(frozen=True)
+class Rules:
+    num_players: int = 4
+    copies_per_card: int = COPIES_PER_CARD
+    categories: int = len(CATEGORIES)
+    ingredients: int = 3                # Ingredients per category (cards in a category set)
+    hand_size: int = 8
+    winning_sets: int = WINNING_SETS
+
+    def __post_init__(self) -> None:
+        if not MIN_PLAYERS <= self.num_players <= MAX_PLAYERS:
+            raise ValueError(f"num_players must be between {MIN_PLAYERS} and {MAX_PLAYERS}.")
+        if self.copies_per_card < 1 or self.categories < 1 or self.ingredients < 1:
+            raise ValueError("copies_per_card, categories and ingredients must be at least 1.")
+        if self.hand_size < 1 or self.winning_sets < 1:
+            raise ValueError("hand_size and winning_sets must be at least 1.")
+        if self.num_card_types > MAX_CARD_TYPES or self.copies_per_card > MAX_COPIES:
+            raise ValueError(f"At most {MAX_CARD_TYPES} card types and {MAX_COPIES} copies per card are supported.")
+        if max(self.categories, self.ingredients, self.hand_size, self.winning_sets) > MAX_FIELD:
+            raise ValueError(f"categories, ingredients, hand_size and winning_sets must be at most {MAX_FIELD}.")
+        if self.deck_size <= self.num_players * self.hand_size:
+            raise ValueError(f"A {self.deck_size} card deck cannot deal {self.hand_size} cards to "
+                             f"{self.num_players} players and leave a card to draw.")
+
+
+    @property
+    def num_card_types(self) -> int:
+        return self.categories * self.ingredients
+
+
+    @property
+    def deck_size(self) -> int:
+        return self.num_card_types * self.copies_per_card
+
+
+    @property
+    def standard_cards(self) -> bool:
+        # The standard deck and win threshold, whatever the seats and hand size. The odds, endgame and tabular
+        # computer players are built on the standard solver tables and need this.
+        return (self.copies_per_card, self.categories, self.ingredients, self.winning_sets) == \
+            (STANDARD.copies_per_card, STANDARD.categories, STANDARD.ingredients, STANDARD.winning_sets)
+
+
+    def with_players(self, num_players: int) -> "Rules":
+        return Rules(num_players, self.copies_per_card, self.categories, self.ingredients, self.hand_size,
+                     self.winning_sets)
+
+
+    # Cards
+
+    @cached_property
+    def cards(self) -> Tuple[Card, ...]:
+        # The card of every id under these rules
+        if (self.categories, self.ingredients) == (len(CATEGORIES), 3):
+            return tuple(CARDS_BY_ID)
+        cards = []
+        for i in range(self.categories):
+            category = _STANDARD_CATEGORIES[i] if i < len(_STANDARD_CATEGORIES) else f"Pot {i + 1}"
+            known = _STANDARD_INGREDIENTS.get(category, [])
+            for j in range(self.ingredients):
+                if j < len(known):
+                    cards.append(Card(category, known[j]))
+                else:
+                    cards.append(Card.extra(category, f"{category} #{j + 1}"))
+        return tuple(cards)
+
+
+    @cached_property
+    def card_ids(self) -> Dict[Card, int]:
+        return {card: cid for cid, card in enumerate(self.cards)}
+
+
+    def card_id(self, card: Card) -> int:
+        return self.card_ids[card]
+
+
+    @cached_property
+    def card_pool(self) -> Tuple[Card, ...]:
+        # Every card of a fresh deck, copies of a card together, in id order
+        return tuple(card for card in self.cards for _ in range(self.copies_per_card))
+
+
+    # Set detection tables (see solver.CategoryTable) and the key step of every card id
+
+    @cached_property
+    def table(self) -> CategoryTable:
+        return category_table(self.ingredients, self.copies_per_card)
+
+
+    @cached_property
+    def key_steps(self) -> List[int]:
+        steps = self.table.steps
+        return [steps[cid % self.ingredients] for cid in range(self.num_card_types)]
+
+
+STANDARD = Rules()
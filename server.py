@@ -0,0 +1,281 @@
+# Network game server. One asyncio process hosts many tables over TCP. Human seats wait for their player's answers
+# without blocking the other tables, computer seats play inline and hand control back to the event loop after every turn.
+#
+# Line protocol, UTF-8, one message per line:
+#   client -> server   "PLAY <humans> <name>" to join a table with that many human seats, then one line per answer
+#   server -> client   "SAY <text>"   print the text
+#                      "ASK <n> <prompt>" show the prompt and send back "<n> <answer>"
+#                      "BYE <text>"   the game is over, the server closes the connection
+#
+# Prompts are numbered per connection. A player who runs out of time may still answer the old prompt later, the number
+# lets the server drop that answer instead of taking it for the reply to the next prompt.
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+from typing import Dict, List
+
+from ai import ComputerStrategy
+from game import Game, blue, bold, green, magenta, red
+from player import Player
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7878
+MOVE_TIMEOUT = 60.0     # Seconds a human has for each answer before the computer moves for them
+
+
+class Seat:
+    # One connected client
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, name: str) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.name = name
+        self.connected = True
+        self.asked = 0          # Number of the latest prompt
+
+
+    async def say(self, text: str = "") -> None:
+        await self._send("".join(f"SAY {line}\n" for line in text.split("\n")))
+
+
+    async def ask(self, prompt: str, timeout: float) -> str | None:
+        # The answer, or None if the player ran out of time, quit or disconnected
+        self.asked += 1
+        await self._send(f"ASK {self.asked} {prompt}\n")
+        if not self.connected:
+            return None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            try:
+                line = await asyncio.wait_for(self.reader.readline(), max(deadline - loop.time(), 0))
+            except asyncio.TimeoutError:
+                await self.say(red("Out of time, the computer moved for you."))
+                return None
+            except ConnectionError:
+                line = b""
+            if not line:
+                self.connected = False
+                return None
+            number, _, answer = line.decode("utf-8", "replace").strip().partition(" ")
+            # Answers to earlier prompts arrive after they timed out and are dropped
+            if number == str(self.asked):
+                break
+        answer = answer.strip().lower()
+        if answer == "q":
+            await self.bye("You left the table, a computer player takes your seat.")
+            return None
+        return answer
+
+
+    async def bye(self, text: str) -> None:
+        await self._send(f"BYE {text}\n")
+        self.close()
+
+
+    def close(self) -> None:
+        if self.connected:
+            self.connected = False
+            self.writer.close()
+
+
+    async def _send(self, data: str) -> None:
+        if not self.connected:
+            return
+        try:
+            self.writer.write(data.encode("utf-8"))
+            await self.writer.drain()
+        except ConnectionError:
+            self.connected = False
+
+
+class Table:
+    # One Game with its connected players. Seats left by a player are played by the computer.
+
+    def __init__(self, table_id: int, humans: int, strategy: ComputerStrategy | None, move_timeout: float) -> None:
+        self.table_id = table_id
+        self.humans = humans
+        self.move_timeout = move_timeout
+        self.game = Game(human_count=humans, strategy=strategy)
+        self.seats: Dict[int, Seat] = {}       # Index in game.players -> client
+
+
+    def full(self) -> bool:
+        return len(self.seats) == self.humans
+
+
+    def sit(self, seat: Seat) -> None:
+        index = len(self.seats)
+        self.seats[index] = seat
+        self.game.players[index].name = seat.name
+
+
+    async def broadcast(self, text: str, skip: Seat | None = None) -> None:
+        await asyncio.gather(*(seat.say(text) for seat in self.seats.values() if seat is not skip and seat.connected))
+
+
+    async def run(self) -> None:
+        game = self.game
+        try:
+            game.deal()
+            await self.broadcast(bold(f"Table {self.table_id}: the first player to complete 3 sets of 3 cards wins."))
+
+            while game.deck.remaining() > 0:
+                current = game.players[game.current_player_index]
+                game.turn += 1
+                seat = self.seats.get(game.current_player_index)
+                await self.push_state(current)
+
+                if seat is not None and seat.connected:
+                    await self.human_turn(current, seat)
+                else:
+                    await self.broadcast(self.computer_turn(current))
+                    await asyncio.sleep(0)      # Let the other tables and clients run between computer turns
+
+                if game.winner is current:
+                    break
+                game.end_turn()
+
+            await self.broadcast("\n".join(self.result_lines()))
+        finally:
+            for seat in self.seats.values():
+                await seat.bye("Game over.")
+
+
+    async def push_state(self, current: Player) -> None:
+        # Every player gets the table from their own seat (their hand only)
+        await asyncio.gather(*(seat.say("\n".join(self.game._table_lines(current, self.game.players[index])))
+                               for index, seat in self.seats.items() if seat.connected))
+
+
+    def computer_turn(self, player: Player) -> str:
+        opponent, card = self.game.computer_draw(player)
+        if opponent is not None:
+            lines = [blue(f"{player.name} takes from {opponent.name}'s discard: {card}")]
+        else:
+            lines = [blue(f"{player.name} draws from deck.")]
+        if self.game.check_win(player):
+            return "\n".join(lines)
+        if player.hand_size() > 0:
+            lines.append(red(f"{player.name} discards: {self.game.computer_discard(player)}"))
+        return "\n".join(lines)
+
+
+    async def human_turn(self, player: Player, seat: Seat) -> None:
+        game = self.game
+        options = {num: opp for num, opp in enumerate(game.draw_options(player), 2)}
+        menu = [bold("You must first draw one card, then discard one."), bold("Draw Options:"),
+                green("  1 - Draw from the deck")]
+        menu += [f"  {num} - Take from {opp.name}'s discard pile" for num, opp in options.items()]
+        menu.append("  q - Leave the table")
+        await seat.say("\n".join(menu))
+
+        while True:
+            choice = await seat.ask("Choose where to draw from: ", self.move_timeout)
+            if choice is None:
+                await self.broadcast(self.computer_turn(player))
+                return
+            if choice == "1":
+                card = game.draw_from_deck(player)
+                await seat.say(green(f"You drew: {card}"))
+                await self.broadcast(blue(f"{player.name} draws from deck."), skip=seat)
+                break
+            if choice.isdigit() and int(choice) in options:
+                opponent = options[int(choice)]
+                card = game.take_discard(player, opponent)
+                await seat.say(green(f"You took: {card} from {opponent.name}"))
+                await self.broadcast(blue(f"{player.name} takes from {opponent.name}'s discard: {card}"), skip=seat)
+                break
+            await seat.say(red("Invalid choice, try again."))
+
+        if game.check_win(player):
+            return
+
+        player.sort_hand()
+        await seat.say("\nYour updated hand:\n" + player.describe_hand())
+        while True:
+            choice = await seat.ask("Choose a card index to discard: ", self.move_timeout)
+            if choice is None:
+                removed = game.computer_discard(player)
+                break
+            if choice.isdigit() and 0 <= int(choice) < player.hand_size():
+                removed = game.discard(player, int(choice))
+                break
+            await seat.say(red("Invalid index."))
+        await self.broadcast(red(f"{player.name} discards: {removed}"))
+
+
+    def result_lines(self) -> List[str]:
+        lines = [bold(magenta("🥘" + "═" * 40 + "🥘")), bold("Game over!")]
+        for p in self.game.players:
+            lines.append(f"{p.name} - sets: {p.sets_in_hand_count()}, score: {p.best_score_in_hand()}, "
+                         f"hand size: {p.hand_size()}")
+        winner = self.game.winner
+        lines.append(red("No one reached 3 sets before deck exhaustion. Draw.") if winner is None
+                     else bold(green(f"{winner.name} wins!")))
+        return lines
+
+
+class GameServer:
+    # Players are seated in the first waiting table for their number of human seats, a table starts once it is full
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, move_timeout: float = MOVE_TIMEOUT,
+                 strategy: ComputerStrategy | None = None) -> None:
+        self.host = host
+        self.port = port
+        self.move_timeout = move_timeout
+        self.strategy = strategy
+        self.tables: Dict[int, Table] = {}             # Tables being played
+        self._waiting: Dict[int, Table] = {}           # Human seat count -> table still filling up
+        self._table_ids = itertools.count(1)
+        self._tasks: set = set()
+
+
+    async def serve_forever(self) -> None:
+        server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        async with server:
+            await server.serve_forever()
+
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        line = await reader.readline()
+        command, _, rest = line.decode("utf-8", "replace").strip().partition(" ")
+        humans, _, name = rest.partition(" ")
+        seat = Seat(reader, writer, name.strip()[:20] or "Player")
+        if command != "PLAY" or not humans.isdigit() or not 1 <= int(humans) <= 4:
+            await seat.bye("Expected: PLAY <human seats 1-4> <name>")
+            return
+
+        table = self.seat_player(seat, int(humans))
+        if table.full():
+            self.start(table)
+        else:
+            await seat.say(f"Waiting for players at table {table.table_id} ({len(table.seats)}/{table.humans})...")
+
+
+    def seat_player(self, seat: Seat, humans: int) -> Table:
+        table = self._waiting.get(humans)
+        if table is None:
+            table = Table(next(self._table_ids), humans, self.strategy, self.move_timeout)
+            self._waiting[humans] = table
+        table.sit(seat)
+        if table.full():
+            del self._waiting[humans]
+        return table
+
+
+    def start(self, table: Table) -> None:
+        self.tables[table.table_id] = table
+        task = asyncio.get_running_loop().create_task(table.run())
+        self._tasks.add(task)
+        task.add_done_callback(lambda _: (self._tasks.discard(task), self.tables.pop(table.table_id, None)))
+
+
+def run_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, move_timeout: float = MOVE_TIMEOUT) -> None:
+    print(f"Hotpot server listening on {host}:{port}")
+    try:
+        asyncio.run(GameServer(host, port, move_timeout).serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,262 @@
+# Headless simulation engine. Runs the same draw / discard / win rules as Game but with no printing, sleeps or sounds so AI vs AI games can be run in bulk for balance studies.
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from typing import Generator, List, Sequence, Tuple
+
+from ai import STEAL_PROBABILITY, ComputerStrategy, HandSizes, Observation
+from card import COPIES_PER_CARD, NUM_CARD_TYPES
+from hand import HandCounts
+from piles import OpenPiles
+from randomness import fisher_yates, make_rng
+from rules import STANDARD, Rules
+
+# The standard game's hand size and categories, for the engines built for the standard deck only (see rules.py)
+HAND_SIZE = STANDARD.hand_size
+NUM_CATEGORIES = STANDARD.categories
+
+# Kinds of decision yielded by SimulationGame.decisions()
+DRAW = 0
+DISCARD = 1
+
+# Cards are plain card ids (see card.CARD_IDS) inside the engine
+_DECK_TEMPLATE: List[int] = [card for card in range(NUM_CARD_TYPES) for _ in range(COPIES_PER_CARD)]
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    winner: int | None              # Seat index of the winner, None for a draw
+    turns: int
+    deck_remaining: int
+    sets: Tuple[int, ...]           # Most disjoint sets in each seat's final hand (same count as find_sets_in_hand)
+    scores: Tuple[int, ...]         # Best score each seat's final hand can earn with those sets
+    category_sets: Tuple[int, ...]  # How many of each seat's sets are category sets, the rest are three of a kinds
+    draws: Tuple[int, ...]          # Cards each seat drew from the deck (not counting the deal)
+    steals: Tuple[int, ...]         # Cards each seat took from a discard pile
+
+
+class SimulationGame:
+    # Computer-only game with no I/O. Cards are ints, and each seat keeps one solver.category_key() per category,
+    # so the win check after a draw is a single table lookup.
+    # Without strategies every seat plays the original random policy on an inlined fast path.
+    # rules (see rules.py) sets the deck, hand size and win threshold, num_players overrides its seat count.
+    # steal_probability is the random policy's chance to take from a discard pile (the fast path only).
+
+    def __init__(self, num_players: int | None = None, seed: int | None = None, rng=None,
+                 strategies: Sequence[ComputerStrategy] | None = None, rules: Rules | None = None,
+                 steal_probability: float = STEAL_PROBABILITY) -> None:
+        rules = rules if rules is not None else STANDARD
+        if num_players is None:
+            num_players = rules.num_players
+        if num_players < 2:
+            raise ValueError("num_players must be at least 2.")
+        if num_players != rules.num_players:
+            rules = rules.with_players(num_players)
+        if strategies is not None and len(strategies) != num_players:
+            raise ValueError("strategies needs one entry per seat.")
+        for strategy in strategies or ():
+            if not strategy.supports(rules):
+                raise ValueError(f"{type(strategy).__name__} cannot play these rules, it is built for the standard deck.")
+        self.num_players = num_players
+        self.rules = rules
+        # A random.Random, a numpy Generator or anything with random.Random's methods
+        self.rng = make_rng(rng) if rng is not None else random.Random(seed)
+        self.strategies = strategies
+        self.steal_probability = steal_probability
+
+
+    def run(self) -> SimulationResult:
+        if self.strategies is not None:
+            return self._run_with_strategies()
+        rng = self.rng
+        rand = rng.random
+        rules = self.rules
+        table = rules.table
+        set_table = table.sets
+        key_step = rules.key_steps
+        ingredients = rules.ingredients
+        winning_sets = rules.winning_sets
+        steal_probability = self.steal_probability
+        n = self.num_players
+
+        # The same uniform shuffle as Deck.fisher_yates_shuffle
+        deck = _deck_template(rules)
+        fisher_yates(deck, rng)
+
+        hands: List[List[int]] = [[] for _ in range(n)]
+        keys: List[List[int]] = [[0] * rules.categories for _ in range(n)]
+        sets = [0] * n
+        discards: List[List[int]] = [[] for _ in range(n)]
+        open_piles = OpenPiles(n)
+        steals = [0] * n
+
+        # Deal round robin, the same order as Game.deal_initial_hands
+        for _ in range(rules.hand_size):
+            for seat in range(n):
+                card = deck.pop()
+                hands[seat].append(card)
+                hand_keys = keys[seat]
+                cat = card // ingredients
+                old = hand_keys[cat]
+                hand_keys[cat] = old + key_step[card]
+                sets[seat] += set_table[old + key_step[card]] - set_table[old]
+
+        winner = None
+        turns = 0
+        seat = 0
+
+        while deck:
+            turns += 1
+            hand = hands[seat]
+            hand_keys = keys[seat]
+
+            # Draw: steal_probability (40% by default) chance to steal from a random opponent's discard pile, otherwise
+            # draw from the deck. The steal candidates are only looked at when the roll asks for a steal, the odds are the
+            # same as Game._computer_turn. The open pile list picks the candidate without scanning every seat.
+            card = -1
+            if rand() < steal_probability:
+                candidates = open_piles.count_for(seat)
+                if candidates:
+                    target = open_piles.nth_for(seat, int(rand() * candidates))
+                    pile = discards[target]
+                    card = pile.pop()
+                    if not pile:
+                        open_piles.emptied(target)
+                    steals[seat] += 1
+            if card < 0:
+                card = deck.pop()
+
+            hand.append(card)
+            cat = card // ingredients
+            old = hand_keys[cat]
+            new = old + key_step[card]
+            hand_keys[cat] = new
+            sets[seat] += set_table[new] - set_table[old]
+
+            # Immediate win check after the draw
+            if sets[seat] >= winning_sets:
+                winner = seat
+                break
+
+            # Discard a random card
+            idx = int(rand() * len(hand))
+            card = hand[idx]
+            hand[idx] = hand[-1]
+            hand.pop()
+            cat = card // ingredients
+            old = hand_keys[cat]
+            new = old - key_step[card]
+            hand_keys[cat] = new
+            sets[seat] += set_table[new] - set_table[old]
+            discards[seat].append(card)
+            open_piles.opened(seat)
+
+            seat += 1
+            if seat == n:
+                seat = 0
+
+        # Seat s played its turns number s + 1, s + 1 + n, ... Every turn was a deck draw or a steal.
+        return SimulationResult(
+            winner=winner,
+            turns=turns,
+            deck_remaining=len(deck),
+            sets=tuple(sets),
+            scores=tuple(sum(table.scores[key] for key in hand_keys) for hand_keys in keys),
+            category_sets=tuple(sum(table.category_sets[key] for key in hand_keys) for hand_keys in keys),
+            draws=tuple((turns - s + n - 1) // n - steals[s] for s in range(n)),
+            steals=tuple(steals),
+        )
+
+
+    def _run_with_strategies(self) -> SimulationResult:
+        # Same rules as run(), with every decision asked from the seat's strategy
+        rng = self.rng
+        strategies = self.strategies
+        steps = self.decisions()
+        kind, obs = next(steps)
+        while True:
+            strategy = strategies[obs.seat]
+            answer = strategy.choose_draw(obs, rng) if kind == DRAW else strategy.choose_discard(obs, rng)
+            try:
+                kind, obs = steps.send(answer)
+            except StopIteration as stop:
+                return stop.value
+
+
+    def decisions(self) -> Generator[Tuple[int, Observation], int | None, SimulationResult]:
+        # The game as a generator of pending decisions, so a driver can answer many games' decisions together.
+        # Yields (DRAW or DISCARD, observation of the seat to move) and takes the answer back through send():
+        # a seat to take from or None for the deck, then a card id to discard. Returns the SimulationResult.
+        rng = self.rng
+        rules = self.rules
+        n = self.num_players
+
+        deck = _deck_template(rules)
+        rng.shuffle(deck)
+        hands = [HandCounts(rules) for _ in range(n)]
+        discards: List[List[int]] = [[] for _ in range(n)]
+        open_piles = OpenPiles(n)
+
+        for _ in range(rules.hand_size):
+            for seat in range(n):
+                hands[seat].add(deck.pop())
+
+        def observe(seat: int, size: int) -> Observation:
+            sizes = HandSizes(n, rules.hand_size, seat, size)
+            return Observation(seat, hands[seat].counts, discards, sizes, len(deck), open_piles.seats, rules)
+
+        winner = None
+        turns = 0
+        seat = 0
+        draws = [0] * n
+        steals = [0] * n
+
+        while deck:
+            turns += 1
+            hand = hands[seat]
+
+            target = yield DRAW, observe(seat, hand.size)
+            if target is not None:
+                pile = discards[target]
+                hand.add(pile.pop())
+                if not pile:
+                    open_piles.emptied(target)
+                steals[seat] += 1
+            else:
+                hand.add(deck.pop())
+                draws[seat] += 1
+
+            if hand.sets >= rules.winning_sets:
+                winner = seat
+                break
+
+            card = yield DISCARD, observe(seat, hand.size)
+            hand.remove(card)
+            discards[seat].append(card)
+            open_piles.opened(seat)
+
+            seat = (seat + 1) % n
+
+        return SimulationResult(
+            winner=winner,
+            turns=turns,
+            deck_remaining=len(deck),
+            sets=tuple(h.sets for h in hands),
+            scores=tuple(h.score for h in hands),
+            category_sets=tuple(h.category_sets() for h in hands),
+            draws=tuple(draws),
+            steals=tuple(steals),
+        )
+
+
+def _deck_template(rules: Rules) -> List[int]:
+    # A fresh deck as card ids, copies of a card together (the same order as Deck's pool)
+    if rules.num_card_types == NUM_CARD_TYPES and rules.copies_per_card == COPIES_PER_CARD:
+        return _DECK_TEMPLATE[:]
+    return [card for card in range(rules.num_card_types) for _ in range(rules.copies_per_card)]
+
+
+def simulate_game(seed: int | None = None, num_players: int = 4) -> SimulationResult:
+    return SimulationGame(num_players=num_players, seed=seed).run()
@@ -0,0 +1,113 @@
+# Optimal set partition solver. Finds the most disjoint sets a hand can form (each card used at most once) and the best score among those partitions.
+#
+# Sets never mix categories, so a hand splits into 8 independent (a, b, c) ingredient count triples. Each triple is solved once and
+# cached, and the answer for a whole hand is the sum over its categories. Every reachable count signature is therefore covered by
+# the precomputed per-category table.
+
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+from card import COPIES_PER_CARD, NUM_CARD_TYPES
+
+WINNING_SETS = 3  # First player to complete 3 sets wins
+THREE_OF_A_KIND_POINTS = 120
+CATEGORY_SET_POINTS = 60
+
+MAX_COPIES = COPIES_PER_CARD    # The largest count a hand can hold
+_BASE = MAX_COPIES + 1
+
+
+@lru_cache(maxsize=None)
+def best_category(*counts: int) -> Tuple[int, int, int]:
+    # Return (sets, score, category_sets) for one category holding the given copies of each of its ingredients
+    # (three in the standard game). Try every number of category sets, the rest of each ingredient forms three of a kinds.
+    best = (0, 0, 0)
+    for category_sets in range(min(counts) + 1):
+        trips = sum((count - category_sets) // 3 for count in counts)
+        sets = category_sets + trips
+        score = category_sets * CATEGORY_SET_POINTS + trips * THREE_OF_A_KIND_POINTS
+        if (sets, score) > best[:2]:
+            best = (sets, score, category_sets)
+    return best
+
+
+def category_key(a: int, b: int, c: int) -> int:
+    return (a * _BASE + b) * _BASE + c
+
+
+# Flat tables indexed by category_key(a, b, c) for counts up to MAX_COPIES, for the simulation engines
+CATEGORY_SETS: List[int] = [0] * _BASE ** 3
+CATEGORY_SCORES: List[int] = [0] * _BASE ** 3
+for _a in range(_BASE):
+    for _b in range(_BASE):
+        for _c in range(_BASE):
+            _sets, _score, _ = best_category(_a, _b, _c)
+            CATEGORY_SETS[category_key(_a, _b, _c)] = _sets
+            CATEGORY_SCORES[category_key(_a, _b, _c)] = _score
+
+# Amount category_key() moves when one copy of a card id is added, by the card's position in its category
+KEY_STEP: List[int] = [(_BASE * _BASE, _BASE, 1)[cid % 3] for cid in range(NUM_CARD_TYPES)]
+
+
+class _LazySolutions(dict):
+    # One column of a CategoryTable too large to fill up front, solved the first time each key is read
+    def __init__(self, table: "CategoryTable", column: int) -> None:
+        super().__init__()
+        self.table = table
+        self.column = column
+
+    def __missing__(self, key: int) -> int:
+        value = self[key] = best_category(*self.table.decode(key))[self.column]
+        return value
+
+
+class CategoryTable:
+    # The flat tables above for any number of ingredients per category and copies per card (see rules.py). Keys are
+    # mixed radix numbers of the ingredient counts, so adding a card moves its category's key by a fixed step.
+    # Small tables are filled up front, large ones as holdings turn up.
+    EAGER_LIMIT = 1 << 12
+
+    def __init__(self, ingredients: int, max_copies: int) -> None:
+        self.ingredients = ingredients
+        self.base = max_copies + 1
+        # Key step of each ingredient position, first ingredient most significant like category_key()
+        self.steps = [self.base ** (ingredients - 1 - i) for i in range(ingredients)]
+        size = self.base ** ingredients
+        if size <= self.EAGER_LIMIT:
+            solutions = [best_category(*self.decode(key)) for key in range(size)]
+            self.sets, self.scores, self.category_sets = (list(column) for column in zip(*solutions))
+        else:
+            self.sets, self.scores, self.category_sets = (_LazySolutions(self, column) for column in range(3))
+
+
+    def key(self, counts: Sequence[int]) -> int:
+        key = 0
+        for count in counts:
+            key = key * self.base + count
+        return key
+
+
+    def decode(self, key: int) -> Tuple[int, ...]:
+        counts = []
+        for step in self.steps:
+            counts.append(key // step % self.base)
+        return tuple(counts)
+
+
+@lru_cache(maxsize=None)
+def category_table(ingredients: int, max_copies: int) -> CategoryTable:
+    return CategoryTable(ingredients, max_copies)
+
+
+def best_partition(counts: Sequence[int], ingredients: int = 3) -> List[Tuple[str, List[int]]]:
+    # The sets of one optimal partition, as (set_type, [card id, ...]). A category set holds one card per ingredient.
+    sets_found = []
+    for base in range(0, len(counts), ingredients):
+        held = counts[base:base + ingredients]
+        category_sets = best_category(*held)[2]
+        for _ in range(category_sets):
+            sets_found.append(("category_set", list(range(base, base + ingredients))))
+        for cid, count in zip(range(base, base + ingredients), held):
+            for _ in range((count - category_sets) // 3):
+                sets_found.append(("three_of_a_kind", [cid, cid, cid]))
+    return sets_found
@@ -0,0 +1,215 @@
+# Compact, immutable game state for search and undo. Cards are card ids, every pile is a tuple of them and every hand a
+# bytes object of counts, so a state is a handful of small immutable values: copying one is free, and a move builds a
+# new state that shares every pile it did not touch with the old one. Game.snapshot() and Game.restore() convert to and
+# from a live Game. A state carries the rules it is played by (see rules.py), and its serialized form records them.
+
+from __future__ import annotations
+
+import struct
+from typing import List, Tuple
+
+from ai import Observation
+from rules import STANDARD, Rules
+
+NO_WINNER = -1
+
+# seats, current seat, turn, winner (-1 for none), deck size, then the rules: copies per card, categories, ingredients,
+# hand size and winning sets
+_HEADER = struct.Struct("<BBIbIHHHHH")
+# Per seat after the hands: deck draws, steals and discard pile size, then the pile
+_SEAT = struct.Struct("<III")
+
+
+class GameState:
+    __slots__ = ("deck", "hands", "discards", "current", "turn", "winner", "draws", "steals", "rules")
+
+    def __init__(self, deck: Tuple[int, ...], hands: Tuple[bytes, ...], discards: Tuple[Tuple[int, ...], ...],
+                 current: int = 0, turn: int = 0, winner: int = NO_WINNER, draws: Tuple[int, ...] | None = None,
+                 steals: Tuple[int, ...] | None = None, rules: Rules | None = None) -> None:
+        set_field = object.__setattr__
+        set_field(self, "deck", deck)               # Card ids, the top of the deck is the last one
+        set_field(self, "hands", hands)             # Per seat, one count byte per card id
+        set_field(self, "discards", discards)       # Per seat, card ids bottom to top
+        set_field(self, "current", current)         # Seat to move
+        set_field(self, "turn", turn)               # Turns played so far
+        set_field(self, "winner", winner)
+        set_field(self, "draws", draws if draws is not None else (0,) * len(hands))
+        set_field(self, "steals", steals if steals is not None else (0,) * len(hands))
+        rules = rules if rules is not None else STANDARD
+        set_field(self, "rules", rules if rules.num_players == len(hands) else rules.with_players(len(hands)))
+
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GameState is immutable")
+
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, GameState) and self._fields() == other._fields()
+
+
+    def __hash__(self) -> int:
+        return hash(self._fields())
+
+
+    def _fields(self) -> tuple:
+        return (self.deck, self.hands, self.discards, self.current, self.turn, self.winner, self.draws, self.steals,
+                self.rules)
+
+
+    def _replace(self, **changes) -> "GameState":
+        fields = dict(zip(self.__slots__, self._fields()))
+        fields.update(changes)
+        return GameState(**fields)
+
+
+    # Queries
+
+    @property
+    def num_players(self) -> int:
+        return len(self.hands)
+
+
+    def hand_size(self, seat: int) -> int:
+        return sum(self.hands[seat])
+
+
+    def sets(self, seat: int) -> int:
+        return _sets(self.hands[seat], self.rules)
+
+
+    def is_over(self) -> bool:
+        return self.winner != NO_WINNER or not self.deck
+
+
+    def observation(self, seat: int) -> Observation:
+        return Observation(seat, list(self.hands[seat]), [list(pile) for pile in self.discards],
+                           [self.hand_size(s) for s in range(self.num_players)], len(self.deck), rules=self.rules)
+
+
+    # Moves for the seat to move. Each returns a new state, the old one is unchanged.
+
+    def draw(self, source: int | None = None) -> "GameState":
+        # Draw from the deck (source None) or take the top card of seat source's discard pile, then check for a win
+        seat = self.current
+        draws, steals, discards = self.draws, self.steals, self.discards
+        if source is None:
+            if not self.deck:
+                raise ValueError("the deck is empty")
+            deck, card = self.deck[:-1], self.deck[-1]
+            draws = _bump(draws, seat)
+        else:
+            if source == seat or not discards[source]:
+                raise ValueError(f"cannot take from seat {source}'s discard pile")
+            deck, card = self.deck, discards[source][-1]
+            discards = _set(discards, source, discards[source][:-1])
+            steals = _bump(steals, seat)
+
+        hand = _add(self.hands[seat], card, 1)
+        winner = seat if _sets(hand, self.rules) >= self.rules.winning_sets else self.winner
+        return self._replace(deck=deck, hands=_set(self.hands, seat, hand), discards=discards, winner=winner,
+                             draws=draws, steals=steals)
+
+
+    def discard(self, cid: int) -> "GameState":
+        # Discard a card and pass the turn to the next seat
+        seat = self.current
+        if not self.hands[seat][cid]:
+            raise ValueError(f"card id {cid} is not in seat {seat}'s hand")
+        return self._replace(hands=_set(self.hands, seat, _add(self.hands[seat], cid, -1)),
+                             discards=_set(self.discards, seat, self.discards[seat] + (cid,)),
+                             current=(seat + 1) % self.num_players, turn=self.turn + 1)
+
+
+    # Hidden information
+
+    def determinize(self, seat: int, rng) -> "GameState":
+        # A state that looks the same from seat's point of view: the cards it cannot see (the deck and the other hands)
+        # are dealt again at random, keeping every hand size and the deck size.
+        order = list(self.deck)
+        for other, hand in enumerate(self.hands):
+            if other != seat:
+                for cid, count in enumerate(hand):
+                    order += [cid] * count
+        rng.shuffle(order)
+
+        hands: List[bytes] = []
+        pos = 0
+        for other, hand in enumerate(self.hands):
+            if other == seat:
+                hands.append(hand)
+                continue
+            size = sum(hand)
+            counts = bytearray(len(hand))
+            for cid in order[pos:pos + size]:
+                counts[cid] += 1
+            hands.append(bytes(counts))
+            pos += size
+        return self._replace(deck=tuple(order[pos:]), hands=tuple(hands))
+
+
+    # Serialization. Card ids take two bytes each and hand counts one (see rules.MAX_CARD_TYPES and MAX_COPIES).
+
+    def to_bytes(self) -> bytes:
+        rules = self.rules
+        parts = [_HEADER.pack(self.num_players, self.current, self.turn, self.winner, len(self.deck),
+                              rules.copies_per_card, rules.categories, rules.ingredients, rules.hand_size,
+                              rules.winning_sets),
+                 _pack_ids(self.deck)]
+        parts += self.hands
+        for seat in range(self.num_players):
+            parts.append(_SEAT.pack(self.draws[seat], self.steals[seat], len(self.discards[seat])))
+            parts.append(_pack_ids(self.discards[seat]))
+        return b"".join(parts)
+
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "GameState":
+        (seats, current, turn, winner, deck_size,
+         copies, categories, ingredients, hand_size, winning_sets) = _HEADER.unpack_from(data)
+        rules = Rules(seats, copies, categories, ingredients, hand_size, winning_sets)
+        pos = _HEADER.size
+        deck = _unpack_ids(data, pos, deck_size)
+        pos += 2 * deck_size
+        hands = []
+        types = rules.num_card_types
+        for _ in range(seats):
+            hands.append(bytes(data[pos:pos + types]))
+            pos += types
+        discards, draws, steals = [], [], []
+        for _ in range(seats):
+            drawn, stolen, size = _SEAT.unpack_from(data, pos)
+            pos += _SEAT.size
+            discards.append(_unpack_ids(data, pos, size))
+            pos += 2 * size
+            draws.append(drawn)
+            steals.append(stolen)
+        return cls(deck, tuple(hands), tuple(discards), current, turn, winner, tuple(draws), tuple(steals), rules)
+
+
+def _pack_ids(ids: Tuple[int, ...]) -> bytes:
+    return struct.pack(f"<{len(ids)}H", *ids)
+
+
+def _unpack_ids(data: bytes, pos: int, count: int) -> Tuple[int, ...]:
+    return struct.unpack_from(f"<{count}H", data, pos)
+
+
+def _sets(hand: bytes, rules: Rules) -> int:
+    # Most disjoint sets of a hand, summed over its categories' solver table entries
+    table = rules.table
+    step = rules.ingredients
+    return sum(table.sets[table.key(hand[base:base + step])] for base in range(0, len(hand), step))
+
+
+def _set(values: tuple, index: int, value) -> tuple:
+    return values[:index] + (value,) + values[index + 1:]
+
+
+def _bump(values: Tuple[int, ...], index: int) -> Tuple[int, ...]:
+    return _set(values, index, values[index] + 1)
+
+
+def _add(hand: bytes, cid: int, delta: int) -> bytes:
+    counts = bytearray(hand)
+    counts[cid] += delta
+    return bytes(counts)
@@ -0,0 +1,194 @@
+# Streaming statistics for long simulation runs. Every accumulator has a fixed size no matter how many games it has
+# seen, and two partial results combine with merge(), so workers can each keep their own and the totals are exact.
+
+from __future__ import annotations
+
+import math
+from typing import List, Tuple
+
+Z_95 = 1.959964     # Normal quantile for 95% confidence intervals
+
+
+class RunningMoments:
+    # Count, mean and variance in one pass (Welford), merged with Chan's parallel formula
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0           # Sum of squared differences from the mean
+
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+
+    def merge(self, other: "RunningMoments") -> None:
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+
+    def stderr(self) -> float:
+        return math.sqrt(self.variance() / self.count) if self.count else math.inf
+
+
+    def interval(self, z: float = Z_95) -> Tuple[float, float]:
+        half = z * self.stderr()
+        return self.mean - half, self.mean + half
+
+
+class Proportion:
+    # Successes out of trials, with a Wilson score interval (stays inside [0, 1] and works for rare events)
+
+    def __init__(self) -> None:
+        self.successes = 0
+        self.trials = 0
+
+
+    def add(self, success: bool, trials: int = 1) -> None:
+        self.successes += success
+        self.trials += trials
+
+
+    def merge(self, other: "Proportion") -> None:
+        self.successes += other.successes
+        self.trials += other.trials
+
+
+    def rate(self) -> float:
+        return self.successes / self.trials if self.trials else 0.0
+
+
+    def interval(self, z: float = Z_95) -> Tuple[float, float]:
+        n = self.trials
+        if n == 0:
+            return 0.0, 1.0
+        p = self.successes / n
+        z2 = z * z
+        center = (p + z2 / (2 * n)) / (1 + z2 / n)
+        half = z * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+        return max(center - half, 0.0), min(center + half, 1.0)
+
+
+    def half_width(self, z: float = Z_95) -> float:
+        low, high = self.interval(z)
+        return (high - low) / 2
+
+
+class Histogram:
+    # Fixed width buckets over [low, high), plus one bucket each for values below and above the range
+
+    def __init__(self, low: int, high: int, width: int = 1) -> None:
+        self.low = low
+        self.high = high
+        self.width = width
+        self.buckets: List[int] = [0] * ((high - low + width - 1) // width + 2)
+
+
+    def add(self, value: float) -> None:
+        if value < self.low:
+            self.buckets[0] += 1
+        elif value >= self.high:
+            self.buckets[-1] += 1
+        else:
+            self.buckets[int(value - self.low) // self.width + 1] += 1
+
+
+    def merge(self, other: "Histogram") -> None:
+        if (other.low, other.high, other.width) != (self.low, self.high, self.width):
+            raise ValueError("Histograms with different buckets cannot be merged.")
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+
+    def count(self) -> int:
+        return sum(self.buckets)
+
+
+    def quantile(self, q: float) -> float:
+        # Lower edge of the bucket holding the q-th value (the range ends for the outside buckets)
+        target = q * self.count()
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                if i == 0:
+                    return self.low
+                if i == len(self.buckets) - 1:
+                    return self.high
+                return self.low + (i - 1) * self.width
+        return self.low
+
+
+class StreamingStats:
+    # Running totals over SimulationResults: wins by seat (in Game.players order), draws, game length, scores and set types.
+    # Memory does not grow with the number of games.
+
+    def __init__(self, num_players: int, max_turns: int = 256) -> None:
+        self.num_players = num_players
+        self.games = 0
+        self.wins = [Proportion() for _ in range(num_players)]
+        self.draws = Proportion()                   # Games that ended with the deck empty
+        self.turns = RunningMoments()
+        self.turn_histogram = Histogram(0, max_turns)
+        self.scores = [RunningMoments() for _ in range(num_players)]
+        self.three_of_a_kind = Proportion()         # Share of final hand sets that are three of a kinds (the rest are category sets)
+
+
+    def add(self, result) -> None:
+        self.games += 1
+        for seat, wins in enumerate(self.wins):
+            wins.add(result.winner == seat)
+        self.draws.add(result.winner is None)
+        self.turns.add(result.turns)
+        self.turn_histogram.add(result.turns)
+        for seat, score in enumerate(result.scores):
+            self.scores[seat].add(score)
+        sets = sum(result.sets)
+        self.three_of_a_kind.add(sets - sum(result.category_sets), sets)
+
+
+    def merge(self, other: "StreamingStats") -> None:
+        self.games += other.games
+        for mine, theirs in zip(self.wins, other.wins):
+            mine.merge(theirs)
+        self.draws.merge(other.draws)
+        self.turns.merge(other.turns)
+        self.turn_histogram.merge(other.turn_histogram)
+        for mine, theirs in zip(self.scores, other.scores):
+            mine.merge(theirs)
+        self.three_of_a_kind.merge(other.three_of_a_kind)
+
+
+    def precise_enough(self, half_width: float) -> bool:
+        # True once the 95% intervals of every seat's win rate and the draw rate are within +/- half_width
+        if self.games == 0:
+            return False
+        return all(p.half_width() <= half_width for p in self.wins + [self.draws])
+
+
+    def summary(self) -> str:
+        def rate(p: Proportion) -> str:
+            low, high = p.interval()
+            return f"{p.rate():.2%} (95% CI {low:.2%} to {high:.2%})"
+
+        low, high = self.turns.interval()
+        lines = [f"Games played: {self.games}",
+                 f"Draws (deck ran out): {self.draws.successes} - {rate(self.draws)}",
+                 f"Average turns: {self.turns.mean:.2f} (95% CI {low:.2f} to {high:.2f}), "
+                 f"median {self.turn_histogram.quantile(0.5):.0f}, 95th percentile {self.turn_histogram.quantile(0.95):.0f}"]
+        for seat in range(self.num_players):
+            lines.append(f"Seat {seat + 1}: wins {self.wins[seat].successes} - {rate(self.wins[seat])}, "
+                         f"average final score {self.scores[seat].mean:.1f}")
+        lines.append(f"Final hand sets that are three of a kinds: {rate(self.three_of_a_kind)}")
+        return "\n".join(lines)
@@ -0,0 +1,185 @@
+# Parameter sweep for tuning the rules and the computer player. Every configuration of a grid plays headless games in
+# rounds over a process pool, and stops getting games once its results are precise enough or clearly worse than the
+# best configuration, so the games go to the close cases. Results go to one CSV table, one row per configuration.
+#
+# Every configuration plays the same seeded games (see tournament.game_seed), and the stopping decisions are made
+# between rounds, so a sweep gives the same table for any worker count.
+
+from __future__ import annotations
+
+import csv
+import itertools
+import random
+from dataclasses import dataclass, fields
+from multiprocessing import Pool
+from typing import Dict, List, Sequence, Tuple
+
+from ai import STEAL_PROBABILITY
+from rules import STANDARD, Rules
+from simulation import SimulationGame
+from stats import Z_95, StreamingStats
+from tournament import game_seed
+
+# Parameters a grid can vary: every Rules field, plus the random computer player's chance to steal
+RULE_PARAMETERS = tuple(field.name for field in fields(Rules))
+PARAMETERS = RULE_PARAMETERS + ("steal_probability",)
+OBJECTIVES = ("wins", "short")      # Most games with a winner, or the shortest games
+
+ROUND_GAMES = 2_000                 # Games each running configuration plays per round
+PIECE_GAMES = 500                   # Games per task handed to a worker, rounds are split so every worker stays busy
+
+# Why a configuration stopped getting games
+RUNNING = "running"
+RESOLVED = "resolved"
+WORSE = "worse"
+LIMIT = "limit"
+
+
+@dataclass
+class SweepEntry:
+    params: Dict[str, float]
+    stats: StreamingStats
+    status: str = RUNNING
+
+
+    def win_interval(self) -> Tuple[float, float]:
+        # Share of games with a winner (every game that is not a draw)
+        low, high = self.stats.draws.interval()
+        return 1.0 - high, 1.0 - low
+
+
+    def objective_interval(self, objective: str) -> Tuple[float, float]:
+        # 95% interval of the objective, larger is better
+        if objective == "wins":
+            return self.win_interval()
+        low, high = self.stats.turns.interval()
+        return -high, -low
+
+
+def parse_grid(specs: Sequence[str]) -> Dict[str, List[float]]:
+    # "hand_size=7,8,9" style specs to {name: values}, integers for the rules and floats for the steal probability
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        name = name.strip()
+        if name not in PARAMETERS:
+            raise ValueError(f"Unknown sweep parameter {name!r}, choose from {', '.join(PARAMETERS)}.")
+        if not values:
+            raise ValueError(f"No values given for {name}.")
+        kind = float if name == "steal_probability" else int
+        grid[name] = [kind(value) for value in values.split(",")]
+    return grid
+
+
+def configurations(grid: Dict[str, Sequence[float]]) -> List[Dict[str, float]]:
+    # Every combination of the grid's values, in grid order. Invalid rules fail here, before any game is played.
+    names = list(grid)
+    configs = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    for params in configs:
+        _rules(params)
+    return configs
+
+
+def _rules(params: Dict[str, float]) -> Rules:
+    values = {name: getattr(STANDARD, name) for name in RULE_PARAMETERS}
+    values.update((name, value) for name, value in params.items() if name in RULE_PARAMETERS)
+    return Rules(**values)
+
+
+def _run_chunk(task: Tuple[int, Dict[str, float], int, int, int]) -> Tuple[int, StreamingStats]:
+    # Totals of one configuration over a block of games
+    index, params, seed, start, stop = task
+    rules = _rules(params)
+    rng = random.Random()
+    sim = SimulationGame(rng=rng, rules=rules, steal_probability=params.get("steal_probability", STEAL_PROBABILITY))
+    stats = StreamingStats(rules.num_players)
+    for game in range(start, stop):
+        rng.seed(game_seed(seed, game))
+        stats.add(sim.run())
+    return index, stats
+
+
+def _update_status(entries: List[SweepEntry], objective: str, precision: float, turn_precision: float,
+                   max_games: int) -> None:
+    running = [entry for entry in entries if entry.status == RUNNING]
+    if not running:
+        return
+    # A configuration is clearly worse once its whole interval is below the best lower bound of any configuration
+    best_low = max(entry.objective_interval(objective)[0] for entry in entries)
+    for entry in running:
+        stats = entry.stats
+        if stats.draws.half_width() <= precision and Z_95 * stats.turns.stderr() <= turn_precision:
+            entry.status = RESOLVED
+        elif entry.objective_interval(objective)[1] < best_low:
+            entry.status = WORSE
+        elif stats.games >= max_games:
+            entry.status = LIMIT
+
+
+def run_sweep(grid: Dict[str, Sequence[float]], max_games: int = 100_000, workers: int = 1, seed: int = 0,
+              objective: str = "wins", precision: float = 0.005, turn_precision: float = 0.5,
+              round_games: int = ROUND_GAMES, report=None) -> List[SweepEntry]:
+    # Play rounds of round_games games for every running configuration until each one is resolved (win rate within
+    # +/- precision and average turns within +/- turn_precision, 95% confidence), clearly worse on the objective, or
+    # has played max_games games. report, when given, is called with the entries after every round.
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {', '.join(OBJECTIVES)}.")
+    entries = []
+    for params in configurations(grid):
+        entries.append(SweepEntry(params, StreamingStats(_rules(params).num_players)))
+
+    pool = Pool(processes=workers) if workers > 1 else None
+    try:
+        while True:
+            tasks = []
+            for index, entry in enumerate(entries):
+                if entry.status == RUNNING:
+                    start = entry.stats.games
+                    stop = min(start + round_games, max_games)
+                    for piece in range(start, stop, PIECE_GAMES):
+                        tasks.append((index, entry.params, seed, piece, min(piece + PIECE_GAMES, stop)))
+            if not tasks:
+                break
+            # Merged in task order, so the totals do not depend on which worker finished first
+            for index, stats in (pool.imap(_run_chunk, tasks) if pool is not None else map(_run_chunk, tasks)):
+                entries[index].stats.merge(stats)
+            _update_status(entries, objective, precision, turn_precision, max_games)
+            if report is not None:
+                report(entries)
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return entries
+
+
+# Output
+
+COLUMNS = ("games", "status", "win_rate", "win_low", "win_high", "turns", "turns_low", "turns_high", "seat1_win_rate")
+
+
+def table_rows(entries: Sequence[SweepEntry]) -> List[List[str]]:
+    # Header plus one row per configuration, parameter columns first
+    names = list(entries[0].params) if entries else []
+    rows = [names + list(COLUMNS)]
+    for entry in entries:
+        stats = entry.stats
+        win_low, win_high = entry.win_interval()
+        turns_low, turns_high = stats.turns.interval()
+        rows.append([str(entry.params[name]) for name in names] + [
+            str(stats.games), entry.status,
+            f"{1.0 - stats.draws.rate():.4f}", f"{win_low:.4f}", f"{win_high:.4f}",
+            f"{stats.turns.mean:.2f}", f"{turns_low:.2f}", f"{turns_high:.2f}",
+            f"{stats.wins[0].rate():.4f}",
+        ])
+    return rows
+
+
+def write_csv(path: str, entries: Sequence[SweepEntry]) -> None:
+    with open(path, "w", newline="") as f:
+        csv.writer(f).writerows(table_rows(entries))
+
+
+def format_table(entries: Sequence[SweepEntry]) -> str:
+    rows = table_rows(entries)
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join("  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows)
@@ -0,0 +1,67 @@
+# Uniformity of the shuffles in randomness.py. Every shuffle of a 4 card list should give each of its 24 orders equally
+# often, checked with a chi-square test over seeded runs so the tests are repeatable.
+
+from __future__ import annotations
+
+import itertools
+import random
+
+import pytest
+
+from randomness import NumpyRandom, fisher_yates, np, shuffle_batch
+
+ITEMS = 4
+ORDERS = list(itertools.permutations(range(ITEMS)))
+SHUFFLES = 1000 * len(ORDERS)
+# Chi-square critical value for 23 degrees of freedom at p = 0.001
+CRITICAL = 49.728
+
+
+def chi_square(orders) -> float:
+    counts = dict.fromkeys(ORDERS, 0)
+    for order in orders:
+        counts[tuple(order)] += 1
+    expected = SHUFFLES / len(ORDERS)
+    return sum((count - expected) ** 2 / expected for count in counts.values())
+
+
+def fisher_yates_orders(rng):
+    for _ in range(SHUFFLES):
+        items = list(range(ITEMS))
+        fisher_yates(items, rng)
+        yield items
+
+
+def test_fisher_yates_random_is_uniform():
+    assert chi_square(fisher_yates_orders(random.Random(12))) < CRITICAL
+
+
+@pytest.mark.skipif(np is None, reason="needs NumPy")
+def test_fisher_yates_numpy_is_uniform():
+    assert chi_square(fisher_yates_orders(NumpyRandom(np.random.default_rng(12)))) < CRITICAL
+
+
+@pytest.mark.skipif(np is None, reason="needs NumPy")
+def test_shuffle_batch_rows_are_uniform():
+    rows = shuffle_batch(SHUFFLES, ITEMS, np.random.default_rng(12))
+    assert rows.shape == (SHUFFLES, ITEMS)
+    assert chi_square(rows.tolist()) < CRITICAL
+
+
+def test_fisher_yates_keeps_the_items():
+    items = list(range(40))
+    fisher_yates(items, random.Random(3))
+    assert sorted(items) == list(range(40))
+
+
+def test_chi_square_catches_a_biased_shuffle():
+    # The naive swap-with-any-position shuffle favours some orders, the test above must be able to see that
+    def naive(rng):
+        for _ in range(SHUFFLES):
+            items = list(range(ITEMS))
+            for i in range(ITEMS):
+                j = rng.randrange(ITEMS)
+                items[i], items[j] = items[j], items[i]
+            yield items
+
+    assert chi_square(naive(random.Random(12))) > CRITICAL
@@ -0,0 +1,70 @@
+# Multi-core tournament runner. Plays headless games over a process pool and merges per-worker totals.
+# Every game is seeded from (seed, game index) alone, so a run gives identical totals for any worker count.
+
+from __future__ import annotations
+
+import random
+from multiprocessing import Pool
+from typing import Iterator, Tuple
+
+from results_store import ResultsWriter, columns_from_results
+from simulation import SimulationGame
+from stats import StreamingStats
+
+CHUNK_SIZE = 5_000        # Games per task handed to a worker
+_SEED_STRIDE = 1 << 40    # Keeps the per-game seeds of different base seeds apart
+
+
+def game_seed(seed: int, index: int) -> int:
+    # Independent, reproducible RNG stream for one game of a run
+    return seed * _SEED_STRIDE + index
+
+
+def _run_chunk(task: Tuple[int, int, int, int, bool]) -> Tuple[StreamingStats, dict | None]:
+    # Totals for a block of games, plus every game's outcome as columns when they are being stored
+    seed, start, stop, num_players, keep_results = task
+    rng = random.Random()
+    sim = SimulationGame(num_players=num_players, rng=rng)
+    stats = StreamingStats(num_players)
+    results = []
+    for index in range(start, stop):
+        rng.seed(game_seed(seed, index))
+        result = sim.run()
+        stats.add(result)
+        if keep_results:
+            results.append(result)
+    return stats, columns_from_results(results, num_players) if keep_results else None
+
+
+def _chunks(games: int, seed: int, num_players: int, keep_results: bool) -> Iterator[Tuple[int, int, int, int, bool]]:
+    for start in range(0, games, CHUNK_SIZE):
+        yield seed, start, min(start + CHUNK_SIZE, games), num_players, keep_results
+
+
+def run_tournament(games: int, workers: int = 1, seed: int = 0, num_players: int = 4,
+                   store: str | None = None, precision: float | None = None) -> StreamingStats:
+    # With store set, every game is also appended to the results store at that path (see results_store.py).
+    # With precision set, games is an upper bound: the run stops after the first chunk where every win rate and the draw
+    # rate is known to within +/- precision (95% confidence).
+    total = StreamingStats(num_players)
+    writer = ResultsWriter(store, num_players) if store is not None else None
+    tasks = _chunks(games, seed, num_players, writer is not None)
+
+    def collect(partials) -> None:
+        for partial, columns in partials:
+            total.merge(partial)
+            if writer is not None:
+                writer.append_columns(columns)
+            if precision is not None and total.precise_enough(precision):
+                break
+
+    if workers <= 1:
+        collect(map(_run_chunk, tasks))
+        return total
+
+    # Workers stream back one StreamingStats per chunk, merged in chunk order: the floating point moments, the games on
+    # disk and the stopping point then come out bit for bit the same for any worker count.
+    # Leaving the with block terminates any chunks still running.
+    with Pool(processes=workers) as pool:
+        collect(pool.imap(_run_chunk, tasks))
+    return total